@@ -5,16 +5,19 @@ import utils.library_override # pyright: ignore[reportUnusedImport]
 from utils.subclasses import Bot
 
 
-with open("Config.toml", "rb") as f:
-    config = tomllib.load(f)
+# the download workers are spawned processes that import this module again,
+# they shouldn't start a bot of their own.
+if __name__ == "__main__":
+    with open("Config.toml", "rb") as f:
+        config = tomllib.load(f)
 
-bot = Bot(
-    intents=discord.Intents().all(),
-    case_insensitive=True,
-    strip_after_prefix=True,
-    config=config,
-)
+    bot = Bot(
+        intents=discord.Intents().all(),
+        case_insensitive=True,
+        strip_after_prefix=True,
+        config=config,
+    )
 
-bot.run(
-    config["Bot"]["TOKEN"],
-)
+    bot.run(
+        config["Bot"]["TOKEN"],
+    )
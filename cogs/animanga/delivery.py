@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import discord
+
+from .. import logger
+
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing import Any, Awaitable, Callable, Mapping
+
+    from utils.subclasses import Bot
+
+# how many DMs can be in flight at once.
+DM_CONCURRENCY = 5
+
+# how many DMs are started per second, each one can cost two requests (opening
+# the DM channel and sending the message), so this stays well under the global
+# rate limit and leaves room for everything else the bot does.
+DM_RATE = 10
+
+# `Cannot send messages to this user` and `Unknown User`
+UNDELIVERABLE_CODES = {50007, 10013}
+
+# `Unknown Channel`, `Missing Access` and `Missing Permissions`
+UNREACHABLE_CHANNEL_CODES = {10003, 50001, 50013}
+
+
+class RateLimiter:
+    """
+    Spaces out calls so at most `rate` of them start every second.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class DeliveryReport(NamedTuple):
+    sent: list[int]
+    failed: list[int]
+    undeliverable: list[int]
+    took: float
+
+    @property
+    def throughput(self) -> float:
+        return len(self.sent) / self.took if self.took else float(len(self.sent))
+
+
+async def fan_out_each(
+    bot: Bot,
+    messages: Mapping[int, dict[str, Any]],
+    *,
+    limiter: RateLimiter,
+    concurrency: int = DM_CONCURRENCY,
+) -> DeliveryReport:
+    """
+    DMs every user their own message, with bounded concurrency.
+
+    A failed DM (whatever it raised) only affects that user, users that can't ever be DMed are
+    returned in `DeliveryReport.undeliverable`.
+
+    Parameters
+    -----------
+    bot: Bot
+        The bot instance.
+
+    messages: Mapping[int, dict[str, Any]]
+        The users to DM, mapped to the kwargs passed to `discord.User.send`.
+
+    limiter: RateLimiter
+        The rate limiter shared between every fan-out.
+
+    concurrency: int
+        How many DMs can be in flight at once.
+    """
+
+    async def get_user(user_id: int) -> discord.abc.Messageable:
+        return bot.get_user(user_id) or await bot.fetch_user(user_id)
+
+    return await _deliver_each(
+        messages,
+        get_user,
+        undeliverable_codes=UNDELIVERABLE_CODES,
+        limiter=limiter,
+        concurrency=concurrency,
+    )
+
+
+async def post_each(
+    bot: Bot,
+    messages: Mapping[int, dict[str, Any]],
+    *,
+    limiter: RateLimiter,
+    concurrency: int = DM_CONCURRENCY,
+) -> DeliveryReport:
+    """
+    Posts every channel its own message, with bounded concurrency.
+
+    Channels that are gone, or that the bot can no longer see or talk in,
+    are returned in `DeliveryReport.undeliverable`.
+
+    Parameters
+    -----------
+    bot: Bot
+        The bot instance.
+
+    messages: Mapping[int, dict[str, Any]]
+        The channels to post in, mapped to the kwargs passed to `send`.
+
+    limiter: RateLimiter
+        The rate limiter shared between every fan-out.
+
+    concurrency: int
+        How many messages can be in flight at once.
+    """
+
+    async def get_channel(channel_id: int) -> discord.abc.Messageable:
+        # no need to fetch the channel just to send a message in it.
+        return bot.get_partial_messageable(channel_id)
+
+    return await _deliver_each(
+        messages,
+        get_channel,
+        undeliverable_codes=UNREACHABLE_CHANNEL_CODES,
+        limiter=limiter,
+        concurrency=concurrency,
+    )
+
+
+async def _deliver_each(
+    messages: Mapping[int, dict[str, Any]],
+    get_target: Callable[[int], Awaitable[discord.abc.Messageable]],
+    *,
+    undeliverable_codes: set[int],
+    limiter: RateLimiter,
+    concurrency: int,
+) -> DeliveryReport:
+    semaphore = asyncio.Semaphore(concurrency)
+    sent: list[int] = []
+    failed: list[int] = []
+    undeliverable: list[int] = []
+
+    async def deliver(target_id: int, kwargs: dict[str, Any]):
+        async with semaphore:
+            await limiter.acquire()
+
+            try:
+                target = await get_target(target_id)
+                await target.send(**kwargs)
+            except discord.HTTPException as err:
+                if err.code in undeliverable_codes:
+                    undeliverable.append(target_id)
+                else:
+                    failed.append(target_id)
+                    logger.warning(f"Failed to deliver to {target_id}: {err}")
+            except Exception:
+                # i.e. a dropped connection, it's only this one that failed.
+                failed.append(target_id)
+                logger.warning(f"Failed to deliver to {target_id}.", exc_info=True)
+            else:
+                sent.append(target_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(deliver(*message) for message in messages.items()))
+
+    return DeliveryReport(
+        sent=sent,
+        failed=failed,
+        undeliverable=undeliverable,
+        took=time.perf_counter() - start,
+    )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import discord
 from discord import app_commands
 from discord.ext import commands
 
@@ -15,11 +16,12 @@ from .utils import (
 from utils.constants import NSFW_ERROR_MSG
 
 from libs.anilist import AniList
-from libs.anilist.types import SearchType
+from libs.anilist.types import QueryProfile, SearchType
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
+    from . import Animanga
     from utils.subclasses import Bot
 
 
@@ -55,7 +57,7 @@ class AnimangaFrontend(BaseCog):
             view=view,
         )
 
-    @commands.hybrid_group(description="...")
+    @commands.hybrid_group(description="...", invoke_without_command=True)
     async def anime(
         self,
         ctx: commands.Context[Bot],
@@ -97,6 +99,142 @@ class AnimangaFrontend(BaseCog):
             search_type=SearchType.ANIME,
         )
 
+    @anime.group(name="reminders", description="...", invoke_without_command=True)
+    async def anime_reminders(self, ctx: commands.Context[Bot]):
+        """
+        Manage reminders for airing Anime.
+        """
+
+        await ctx.send_help(ctx.command)
+
+    @anime_reminders.command(name="channel")
+    @commands.guild_only()
+    @commands.has_guild_permissions(manage_guild=True)
+    @app_commands.autocomplete(query=AniList.anime_auto_complete)
+    async def anime_reminders_channel(
+        self,
+        ctx: commands.Context[Bot],
+        channel: discord.TextChannel,
+        role: Optional[discord.Role] = None,
+        *,
+        query: str,
+    ):
+        """
+        Toggle posting a reminder in a channel whenever an episode of an Anime airs.
+
+        Parameters
+        -----------
+        channel: discord.TextChannel
+            The channel to post the reminders in.
+
+        role: Optional[discord.Role]
+            A role to ping with every reminder.
+
+        query: str
+            The Anime to post reminders for.
+        """
+
+        assert ctx.guild
+
+        # looking the anime up can take a while, don't let the interaction time out.
+        await ctx.defer()
+
+        media = await self.anilist.fetch(
+            query,
+            search_type=SearchType.ANIME,
+            profile=QueryProfile.AIRING,
+        )
+        if not media:
+            return await ctx.send(content="No anime found.")
+
+        reminders: Optional[Animanga] = self.bot.get_cog("Animanga")  # pyright: ignore[reportAssignmentType]
+        if not reminders:
+            raise ValueError("Animanga cog not loaded")
+
+        # removing a subscription is always fine, even if the bot lost access since.
+        if not await reminders.has_channel_reminder(channel.id, media.id):
+            permissions = channel.permissions_for(ctx.guild.me)
+            if not (
+                permissions.view_channel
+                and permissions.send_messages
+                and permissions.embed_links
+            ):
+                return await ctx.send(
+                    content=f"I need to be able to view, send messages and embed links in {channel.mention}.",
+                    allowed_mentions=discord.AllowedMentions.none(),
+                )
+
+            if role and (
+                role.is_default()
+                or not (role.mentionable or permissions.mention_everyone)
+            ):
+                return await ctx.send(
+                    content=f"I can't mention {role.mention} in {channel.mention}.",
+                    allowed_mentions=discord.AllowedMentions.none(),
+                )
+
+        is_toggled = await reminders.toggle_channel_reminder_for(
+            ctx.guild.id,
+            channel.id,
+            media.id,
+            role.id if role else None,
+        )
+
+        if not is_toggled:
+            return await ctx.send(
+                content=f"No longer posting reminders for **{media.title}** in {channel.mention}."
+            )
+
+        await ctx.send(
+            content=f"Got it! I'll post in {channel.mention} when an episode of **{media.title}** is released.",
+            allowed_mentions=discord.AllowedMentions.none(),
+        )
+
+    @anime_reminders.command(name="import")
+    async def anime_reminders_import(
+        self,
+        ctx: commands.Context[Bot],
+        user: str,
+    ):
+        """
+        Get reminders for every airing Anime on your AniList watching list.
+
+        Parameters
+        -----------
+        user: str
+            Your AniList username.
+        """
+
+        async with ctx.typing():
+            try:
+                watching = await self.anilist.fetch_airing_watchlist(user)
+            except Exception:
+                return await ctx.send(
+                    content=f"Couldn't fetch the list of `{user}`, is their profile public?",
+                    allowed_mentions=discord.AllowedMentions.none(),
+                )
+
+            if not watching:
+                return await ctx.send(
+                    content="Nothing on that list is airing right now."
+                )
+
+            reminders: Optional[Animanga] = self.bot.get_cog("Animanga")  # pyright: ignore[reportAssignmentType]
+            if not reminders:
+                raise ValueError("Animanga cog not loaded")
+
+            added = await reminders.import_reminders_for(
+                ctx.author.id,
+                [media.id for media in watching],
+            )
+
+        await ctx.send(
+            content=(
+                f"Got it! I'll remind you about {len(added)} more anime "
+                f"({len(watching) - len(added)} of the {len(watching)} airing were already set)."
+            )
+        )
+
     @commands.hybrid_group(description="...")
     async def manga(
         self,
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+
+from .. import logger
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Iterable
+
+    from asyncpg import Pool
+
+
+class ReminderIndex:
+    """
+    An in-memory copy of `anime_reminders`, indexed both ways.
+
+    It's loaded from the database on first use, after that every toggle
+    writes through to the database and then updates the index, so reads
+    never have to leave the process.
+    """
+
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self.by_user: defaultdict[int, set[int]] = defaultdict(set)
+        self.by_anime: defaultdict[int, set[int]] = defaultdict(set)
+        self.loaded = False
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        """
+        (Re)builds the index from the database.
+        """
+
+        async with self._lock:
+            rows = await self.pool.fetch(
+                "SELECT user_id, anilist_id FROM anime_reminders"
+            )
+
+            by_user: defaultdict[int, set[int]] = defaultdict(set)
+            by_anime: defaultdict[int, set[int]] = defaultdict(set)
+            for row in rows:
+                by_user[row["user_id"]].add(row["anilist_id"])
+                by_anime[row["anilist_id"]].add(row["user_id"])
+
+            self.by_user, self.by_anime = by_user, by_anime
+            self.loaded = True
+
+        logger.info(
+            f"Loaded {len(rows)} reminders for {len(by_user)} users "
+            f"across {len(by_anime)} anime."
+        )
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self.load()
+
+    async def is_following(self, user_id: int, anime_id: int) -> bool:
+        await self.ensure_loaded()
+        return anime_id in self.by_user.get(user_id, ())
+
+    async def counts(self) -> dict[int, int]:
+        """
+        How many users follow each anime.
+        """
+
+        await self.ensure_loaded()
+        return {anime_id: len(users) for anime_id, users in self.by_anime.items()}
+
+    def add(self, user_id: int, anime_id: int):
+        self.by_user[user_id].add(anime_id)
+        self.by_anime[anime_id].add(user_id)
+
+    def discard(self, user_id: int, anime_id: int):
+        if (anime := self.by_user.get(user_id)) is not None:
+            anime.discard(anime_id)
+            if not anime:
+                del self.by_user[user_id]
+
+        if (users := self.by_anime.get(anime_id)) is not None:
+            users.discard(user_id)
+            if not users:
+                del self.by_anime[anime_id]
+
+    def discard_users(self, user_ids: Iterable[int]):
+        for user_id in user_ids:
+            for anime_id in self.by_user.pop(user_id, ()):
+                if (users := self.by_anime.get(anime_id)) is not None:
+                    users.discard(user_id)
+                    if not users:
+                        del self.by_anime[anime_id]
+
+    async def toggle(self, user_id: int, anime_id: int) -> bool:
+        """
+        Toggles the reminder in the database, then mirrors the result here.
+        """
+
+        await self.ensure_loaded()
+
+        # held so a reload can't swap in a snapshot taken before this write.
+        async with self._lock:
+            result = await self.pool.fetchval(
+                "SELECT toggle_reminder($1, $2)",
+                user_id,
+                anime_id,
+            )
+
+            if result == 1:
+                self.add(user_id, anime_id)
+                return True
+
+            self.discard(user_id, anime_id)
+            return False
@@ -3,127 +3,672 @@ from __future__ import annotations
 import discord
 from discord.ext import tasks
 
+import asyncio
+
+from collections import Counter
+from datetime import datetime, timedelta
+
 from utils.constants import BELL
-from libs.livechart import LiveChartClient, Anime
+from libs.anilist.types import AiringSchedule
 
 from .. import BaseCog, logger
+from .schedule import ScheduleDiff, airing_key, diff_schedules
+from .scheduler import ReminderScheduler
+from .delivery import DM_RATE, RateLimiter, fan_out_each, post_each
+from .index import ReminderIndex
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from typing import Any, Mapping, Optional
+
+    from asyncpg import Record
+
     from utils.subclasses import Bot
 
+    from .schedule import AiringKey
+
+# how far ahead the airing feed looks for episodes.
+LOOKAHEAD = timedelta(days=1)
+
+# how many users have their pending deliveries claimed from the outbox at once.
+OUTBOX_BATCH_SIZE = 500
+# how long a claimed delivery is left alone before it's retried.
+OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=5)
+# deliveries older than this aren't worth sending anymore.
+OUTBOX_MAX_AGE = timedelta(hours=6)
+# how long airings (and their deliveries) are kept around for.
+OUTBOX_RETENTION = timedelta(days=7)
+# discord only allows this many embeds in a single message.
+MAX_DIGEST_SIZE = 10
+
+
+def channel_outbox_keys(rows: list[Record]) -> tuple[list[int], list[int], list[int]]:
+    """
+    The `(channel_id, anilist_id, episode)` columns of the channel outbox rows,
+    to be passed to `unnest`.
+    """
+
+    return (
+        [row["channel_id"] for row in rows],
+        [row["anilist_id"] for row in rows],
+        [row["episode"] for row in rows],
+    )
+
 
 class AnimangaReminders(BaseCog):
     def __init__(self, bot: Bot) -> None:
         super().__init__(bot)
-        self.client = LiveChartClient()
-        self.titles: list[Anime] = []
-        self.currently_sleeping_for: Optional[int] = None
+        self.schedule: dict[AiringKey, AiringSchedule] = {}
+        self.scheduler = ReminderScheduler(self.enqueue_reminders_for)
+        self.dm_limiter = RateLimiter(DM_RATE)
+        self.outbox_lock = asyncio.Lock()
+        self.churn: Counter[str] = Counter()
+        self._tracking: set[asyncio.Task[None]] = set()
+        self.reminders = ReminderIndex(bot.pool)
+        self.digest_window = timedelta(
+            seconds=(self.CONFIG or {}).get("DIGEST_WINDOW", 0)
+        )
 
     async def toggle_reminder_for(
         self,
         user_id: int,
         anime_id: int,
     ) -> bool:
-        result = await self.bot.pool.fetchval(
-            "SELECT toggle_reminder($1, $2)",
+        if not await self.reminders.toggle(user_id, anime_id):
+            return False
+
+        if not any(title.media_id == anime_id for title in self.schedule.values()):
+            self.track_later(anime_id)
+
+        return True
+
+    async def import_reminders_for(
+        self,
+        user_id: int,
+        anime_ids: list[int],
+    ) -> list[int]:
+        """
+        Subscribes a user to every given anime in a single statement,
+        returning the IDs they weren't already subscribed to.
+        """
+
+        rows = await self.bot.pool.fetch(
+            """
+            INSERT INTO anime_reminders (user_id, anilist_id)
+                SELECT $1, unnest($2::INT[])
+            ON CONFLICT DO NOTHING
+            RETURNING anilist_id
+            """,
             user_id,
+            anime_ids,
+        )
+
+        added = [row["anilist_id"] for row in rows]
+        for anime_id in added:
+            self.reminders.add(user_id, anime_id)
+
+        tracked = {title.media_id for title in self.schedule.values()}
+        if untracked := [anime_id for anime_id in added if anime_id not in tracked]:
+            self.track_later(*untracked)
+
+        return added
+
+    async def has_channel_reminder(self, channel_id: int, anime_id: int) -> bool:
+        return bool(
+            await self.bot.pool.fetchval(
+                """
+                SELECT TRUE FROM anime_channel_reminders
+                    WHERE channel_id = $1
+                      AND anilist_id = $2
+                """,
+                channel_id,
+                anime_id,
+            )
+        )
+
+    async def toggle_channel_reminder_for(
+        self,
+        guild_id: int,
+        channel_id: int,
+        anime_id: int,
+        role_id: Optional[int] = None,
+    ) -> bool:
+        removed = await self.bot.pool.fetchval(
+            """
+            DELETE FROM anime_channel_reminders
+                WHERE channel_id = $1
+                  AND anilist_id = $2
+            RETURNING TRUE
+            """,
+            channel_id,
+            anime_id,
+        )
+
+        if removed:
+            return False
+
+        await self.bot.pool.execute(
+            """
+            INSERT INTO anime_channel_reminders (guild_id, channel_id, anilist_id, role_id)
+                VALUES ($1, $2, $3, $4)
+            """,
+            guild_id,
+            channel_id,
             anime_id,
+            role_id,
         )
 
-        if anime_id == self.currently_sleeping_for:
-            self.restart_user_reminders()
+        if not any(title.media_id == anime_id for title in self.schedule.values()):
+            self.track_later(anime_id)
 
-        return result == 1
+        return True
+
+    def track_later(self, *anime_ids: int):
+        """
+        Runs `track` in the background, so the subscription can be answered
+        without waiting on AniList. The hourly feed picks the anime up anyway
+        if it fails.
+        """
+
+        task = asyncio.create_task(self.track(*anime_ids))
+        self._tracking.add(task)
+        task.add_done_callback(self._tracked)
+
+    def _tracked(self, task: asyncio.Task[None]):
+        self._tracking.discard(task)
+
+        if not task.cancelled() and (error := task.exception()):
+            logger.exception(
+                "Adding newly followed anime to the feed failed.", exc_info=error
+            )
+
+    async def track(self, *anime_ids: int):
+        """
+        Adds the upcoming episodes of newly followed anime to the feed,
+        without re-fetching everything else.
+        """
+
+        now = discord.utils.utcnow()
+        schedules = await self.bot.anilist.fetch_airing_schedules(
+            anime_ids,
+            after=now,
+            before=now + LOOKAHEAD,
+        )
+
+        if schedules:
+            self.update_schedule([*self.schedule.values(), *schedules])
+
+    def update_schedule(self, titles: list[AiringSchedule]) -> ScheduleDiff:
+        diff = diff_schedules(self.schedule.values(), titles)
+
+        # always swap the data in, a new thumbnail shouldn't need a diff event.
+        self.schedule = {airing_key(title): title for title in titles}
+
+        self.churn.update(
+            added=len(diff.added),
+            removed=len(diff.removed),
+            rescheduled=len(diff.rescheduled),
+        )
+
+        if diff.churn:
+            logger.info(
+                f"Airing feed changed: +{len(diff.added)} -{len(diff.removed)} "
+                f"~{len(diff.rescheduled)} ({dict(self.churn)} in total)."
+            )
+
+        self.apply_diff(diff)
+        return diff
+
+    def apply_diff(self, diff: ScheduleDiff):
+        """
+        Only touches the timers of the airings that changed.
+        """
+
+        for title in diff.removed:
+            self.scheduler.cancel(title)
+
+        for title in (*diff.added, *diff.rescheduled):
+            self.scheduler.schedule(title)
 
     @tasks.loop(hours=1)
-    async def livechart_watcher(self):
-        titles = await self.client.fetch_today(ignore_old=True)
+    async def airing_watcher(self):
+        # resync with the database, in case another process changed it.
+        await self.reminders.load()
+        interest = Counter(await self.reminders.counts())
+
+        # a channel subscription is interest too, however many members it reaches.
+        for row in await self.bot.pool.fetch(
+            """
+            SELECT anilist_id, COUNT(*) AS channels FROM anime_channel_reminders
+                GROUP BY anilist_id
+            """
+        ):
+            interest[row["anilist_id"]] += row["channels"]
+
+        now = discord.utils.utcnow()
+        after = now
+        if self.airing_watcher.current_loop == 0:
+            after = await self.missed_since(now)
+
+        # anything that's already due fires right away.
+        titles = await self.bot.anilist.fetch_airing_schedules(
+            interest,
+            after=after,
+            before=now + LOOKAHEAD,
+        )
 
-        if len(titles) <= 3:
-            titles = await self.client.fetch_tomorrow(ignore_old=True)
+        self.update_schedule(titles)
 
-        if len(titles) <= 3:
-            titles += await self.client.fetch_titles_after_day(2, ignore_old=True)
+        for title in titles:
+            logger.info(
+                f"{interest[title.media_id]} users and channels are interested in {title.title!r}, "
+                f"episode {title.episode} premieres at {title.airing_at}"
+            )
 
-        if titles != self.titles:
-            self.restart_user_reminders()
+    async def missed_since(self, now: datetime) -> datetime:
+        """
+        Where the feed should start on startup, so the airings that came due
+        while the bot was down still get queued.
+
+        That's the newest airing that was queued, but never further back than
+        `OUTBOX_MAX_AGE`, since the outbox wouldn't send anything older. The
+        airings that were queued already are skipped by `enqueue_reminders_for`.
 
-        self.titles = titles
+        If nothing was ever queued (i.e. the first deploy), it's `now`, there's
+        no telling whether the bot was down or who was subscribed back then.
+        """
 
-    async def send_reminders_out_for(self, anime: Anime):
-        users = await self.bot.pool.fetch(
-            "SELECT user_id FROM anime_reminders WHERE anilist_id = $1",
-            anime["anilist_id"],
+        oldest = now - OUTBOX_MAX_AGE
+        newest: Optional[datetime] = await self.bot.pool.fetchval(
+            "SELECT MAX(airing_at) FROM anime_airings"
         )
 
-        if not users:
-            return
+        if not newest:
+            return now
+
+        if newest < oldest:
+            return oldest
+
+        # the feed's lower bound is exclusive, and another airing might share its air time.
+        return min(newest - timedelta(seconds=1), now)
+
+    async def enqueue_reminders_for(self, anime: AiringSchedule):
+        """
+        Writes a pending delivery for every user and channel following the
+        anime to the outbox, then starts draining it.
+        """
+
+        async with self.bot.pool.acquire() as conn, conn.transaction():
+            queued = await conn.fetchval(
+                """
+                INSERT INTO anime_airings (anilist_id, episode, airing_at, title, native_title, thumbnail)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                ON CONFLICT DO NOTHING
+                RETURNING TRUE
+                """,
+                anime.media_id,
+                anime.episode,
+                anime.airing_at,
+                anime.title,
+                anime.native_title,
+                anime.thumbnail,
+            )
+
+            # another process (or a previous run) has already queued this episode.
+            if not queued:
+                return
+
+            status = await conn.execute(
+                """
+                INSERT INTO anime_reminder_outbox (anilist_id, episode, user_id)
+                    SELECT anilist_id, $2, user_id FROM anime_reminders
+                        WHERE anilist_id = $1
+                """,
+                anime.media_id,
+                anime.episode,
+            )
+
+            channel_status = await conn.execute(
+                """
+                INSERT INTO anime_channel_outbox (anilist_id, episode, channel_id, role_id)
+                    SELECT anilist_id, $2, channel_id, role_id FROM anime_channel_reminders
+                        WHERE anilist_id = $1
+                """,
+                anime.media_id,
+                anime.episode,
+            )
 
-        user_ids = [user["user_id"] for user in users]
         logger.info(
-            f"Sending reminders to {user_ids} users about {anime['title']['romaji']!r}."
+            f"Queued {status.split()[-1]} reminders and {channel_status.split()[-1]} channel posts "
+            f"for episode {anime.episode} of {anime.title!r}."
         )
 
-        users = [
-            self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
-            for user_id in user_ids
-        ]
+        await self.drain_outbox()
 
-        embed = discord.Embed(
+    def build_embed(self, airing: Mapping[str, Any]) -> discord.Embed:
+        return discord.Embed(
             title=(
-                f"{BELL} Episode {', '.join(anime['episodes'])} of {anime['title']['romaji']} "
-                f"({anime['title']['native']!r}) has premiered {discord.utils.format_dt(anime['premiere'], 'R')}!"
+                f"{BELL} Episode {airing['episode']} of {airing['title']} "
+                f"({airing['native_title']!r}) has premiered {discord.utils.format_dt(airing['airing_at'], 'R')}!"
             ),
-        ).set_thumbnail(url=anime["thumbnail"])
+        ).set_thumbnail(url=airing["thumbnail"])
 
-        for user in users:
-            await user.send(embed=embed)
+    async def drain_outbox(self):
+        """
+        Claims pending deliveries in batches and sends them out until the
+        outbox is empty, then does the same for the channel posts. Rows are claimed with `SKIP LOCKED`, so several
+        processes can drain it at the same time.
+
+        Batches are made of whole users rather than rows, so a user's pending
+        deliveries are never split across two DMs. With a digest window set,
+        they're only claimed once the oldest of them has waited out the
+        window, so everything that aired in the meantime goes out together.
+        """
 
-    @tasks.loop(minutes=5)
-    async def user_reminders(self):
-        titles = self.titles
+        async with self.outbox_lock:
+            while rows := await self.bot.pool.fetch(
+                """
+                WITH due_users AS (
+                    SELECT user_id FROM anime_reminder_outbox
+                        WHERE delivered_at IS NULL
+                          AND created_at > NOW() - $2::INTERVAL
+                          AND (claimed_at IS NULL OR claimed_at < NOW() - $3::INTERVAL)
+                        GROUP BY user_id
+                        HAVING MIN(created_at) <= NOW() - $4::INTERVAL
+                        ORDER BY MIN(created_at)
+                        LIMIT $1
+                )
+                UPDATE anime_reminder_outbox AS outbox
+                    SET claimed_at = NOW()
+                FROM (
+                    SELECT anilist_id, episode, user_id FROM anime_reminder_outbox
+                        WHERE delivered_at IS NULL
+                          AND created_at > NOW() - $2::INTERVAL
+                          AND (claimed_at IS NULL OR claimed_at < NOW() - $3::INTERVAL)
+                          AND user_id IN (SELECT user_id FROM due_users)
+                        FOR UPDATE SKIP LOCKED
+                ) AS due
+                WHERE outbox.anilist_id = due.anilist_id
+                  AND outbox.episode = due.episode
+                  AND outbox.user_id = due.user_id
+                RETURNING outbox.anilist_id, outbox.episode, outbox.user_id
+                """,
+                OUTBOX_BATCH_SIZE,
+                OUTBOX_MAX_AGE,
+                OUTBOX_CLAIM_TIMEOUT,
+                self.digest_window,
+            ):
+                await self.deliver(rows)
+
+            while rows := await self.bot.pool.fetch(
+                """
+                UPDATE anime_channel_outbox AS outbox
+                    SET claimed_at = NOW()
+                FROM (
+                    SELECT anilist_id, episode, channel_id FROM anime_channel_outbox
+                        WHERE delivered_at IS NULL
+                          AND created_at > NOW() - $2::INTERVAL
+                          AND (claimed_at IS NULL OR claimed_at < NOW() - $3::INTERVAL)
+                        ORDER BY created_at
+                        LIMIT $1
+                        FOR UPDATE SKIP LOCKED
+                ) AS due
+                WHERE outbox.anilist_id = due.anilist_id
+                  AND outbox.episode = due.episode
+                  AND outbox.channel_id = due.channel_id
+                RETURNING outbox.anilist_id, outbox.episode, outbox.channel_id, outbox.role_id
+                """,
+                OUTBOX_BATCH_SIZE,
+                OUTBOX_MAX_AGE,
+                OUTBOX_CLAIM_TIMEOUT,
+            ):
+                await self.post(rows)
+
+    async def fetch_airings(self, keys: set[AiringKey]) -> dict[AiringKey, Record]:
+        return {
+            (airing["anilist_id"], airing["episode"]): airing
+            for airing in await self.bot.pool.fetch(
+                """
+                SELECT * FROM anime_airings
+                    WHERE (anilist_id, episode) IN (
+                        SELECT * FROM unnest($1::INT[], $2::INT[])
+                    )
+                """,
+                [anilist_id for anilist_id, _ in keys],
+                [episode for _, episode in keys],
+            )
+        }
 
-        for title in titles:
-            users = await self.bot.pool.fetchval(
-                "SELECT COUNT(*) FROM anime_reminders WHERE anilist_id = $1",
-                title["anilist_id"],
+    async def deliver(self, rows: list[Record]):
+        digests: dict[int, list[AiringKey]] = {}
+        for row in rows:
+            digests.setdefault(row["user_id"], []).append(
+                (row["anilist_id"], row["episode"])
+            )
+
+        airings = await self.fetch_airings(
+            {key for keys in digests.values() for key in keys}
+        )
+        embeds = {key: self.build_embed(airing) for key, airing in airings.items()}
+
+        # the airing was cleaned up in the meantime, so these can never be sent.
+        orphaned = [
+            (user_id, key)
+            for user_id, user_keys in digests.items()
+            for key in user_keys
+            if key not in embeds
+        ]
+        if orphaned:
+            await self.bot.pool.execute(
+                """
+                DELETE FROM anime_reminder_outbox AS outbox
+                    USING unnest($1::BIGINT[], $2::INT[], $3::INT[]) AS orphaned (user_id, anilist_id, episode)
+                    WHERE outbox.user_id = orphaned.user_id
+                      AND outbox.anilist_id = orphaned.anilist_id
+                      AND outbox.episode = orphaned.episode
+                """,
+                [user_id for user_id, _ in orphaned],
+                [anilist_id for _, (anilist_id, _) in orphaned],
+                [episode for _, (_, episode) in orphaned],
             )
 
-            if not users:
-                logger.info(f"No user interested in {title['title']['romaji']!r}.")
+        messages: dict[int, dict[str, Any]] = {}
+        included: dict[int, list[AiringKey]] = {}
+        overflow: list[tuple[int, AiringKey]] = []
+        for user_id, user_keys in digests.items():
+            user_keys = [key for key in user_keys if key in embeds]
+            if not user_keys:
                 continue
 
-            logger.info(
-                f"{users} users are interested in {title['title']['romaji']!r}, episode premieres at {title['premiere']}"
+            # a message can only hold so many embeds, the rest go out with the next batch.
+            included[user_id] = user_keys[:MAX_DIGEST_SIZE]
+            overflow.extend((user_id, key) for key in user_keys[MAX_DIGEST_SIZE:])
+            messages[user_id] = {"embeds": [embeds[key] for key in included[user_id]]}
+
+        if overflow:
+            await self.bot.pool.execute(
+                """
+                UPDATE anime_reminder_outbox AS outbox SET claimed_at = NULL
+                    FROM unnest($1::BIGINT[], $2::INT[], $3::INT[]) AS released (user_id, anilist_id, episode)
+                    WHERE outbox.user_id = released.user_id
+                      AND outbox.anilist_id = released.anilist_id
+                      AND outbox.episode = released.episode
+                """,
+                [user_id for user_id, _ in overflow],
+                [anilist_id for _, (anilist_id, _) in overflow],
+                [episode for _, (_, episode) in overflow],
+            )
+
+        report = await fan_out_each(self.bot, messages, limiter=self.dm_limiter)
+
+        # failed deliveries stay claimed, and get retried once the claim times out.
+        done = [
+            (user_id, key)
+            for user_id in (*report.sent, *report.undeliverable)
+            for key in included[user_id]
+        ]
+        await self.bot.pool.execute(
+            """
+            UPDATE anime_reminder_outbox AS outbox SET delivered_at = NOW()
+                FROM unnest($1::BIGINT[], $2::INT[], $3::INT[]) AS done (user_id, anilist_id, episode)
+                WHERE outbox.user_id = done.user_id
+                  AND outbox.anilist_id = done.anilist_id
+                  AND outbox.episode = done.episode
+            """,
+            [user_id for user_id, _ in done],
+            [anilist_id for _, (anilist_id, _) in done],
+            [episode for _, (_, episode) in done],
+        )
+
+        if report.undeliverable:
+            # they can't be DMed at all anymore, so stop trying.
+            await self.bot.pool.execute(
+                "DELETE FROM anime_reminders WHERE user_id = ANY($1::BIGINT[])",
+                report.undeliverable,
             )
+            self.reminders.discard_users(report.undeliverable)
 
-            self.currently_sleeping_for = title["anilist_id"]
-            await discord.utils.sleep_until(title["premiere"])
+        logger.info(
+            f"Sent {len(report.sent)}/{len(messages)} reminder DMs "
+            f"({sum(len(included[user_id]) for user_id in report.sent)} episodes) "
+            f"in {report.took:.2f}s ({report.throughput:.1f} DMs/s), "
+            f"{len(report.failed)} failed and {len(report.undeliverable)} undeliverable."
+        )
+
+    async def post(self, rows: list[Record]):
+        """
+        Posts the claimed channel reminders, every channel gets a single
+        message with an embed for each of its airings.
+        """
+
+        posts: dict[int, list[Record]] = {}
+        for row in rows:
+            posts.setdefault(row["channel_id"], []).append(row)
+
+        airings = await self.fetch_airings(
+            {(row["anilist_id"], row["episode"]) for row in rows}
+        )
+        embeds = {key: self.build_embed(airing) for key, airing in airings.items()}
+
+        messages: dict[int, dict[str, Any]] = {}
+        included: dict[int, list[Record]] = {}
+        released: list[Record] = []
+        orphaned: list[Record] = []
+        for channel_id, channel_rows in posts.items():
+            postable: list[Record] = []
+            for row in channel_rows:
+                if (row["anilist_id"], row["episode"]) in embeds:
+                    postable.append(row)
+                else:
+                    orphaned.append(row)
+
+            if not postable:
+                continue
+
+            included[channel_id] = postable[:MAX_DIGEST_SIZE]
+            released.extend(postable[MAX_DIGEST_SIZE:])
+
+            role_ids = list(
+                dict.fromkeys(
+                    filter(None, (row["role_id"] for row in included[channel_id]))
+                )
+            )
+            messages[channel_id] = {
+                "embeds": [
+                    embeds[(row["anilist_id"], row["episode"])]
+                    for row in included[channel_id]
+                ],
+                "content": " ".join(f"<@&{role_id}>" for role_id in role_ids) or None,
+                "allowed_mentions": discord.AllowedMentions(
+                    everyone=False,
+                    users=False,
+                    roles=[discord.Object(role_id) for role_id in role_ids] or False,
+                ),
+            }
+
+        if orphaned:
+            # the airing was cleaned up in the meantime, so these can never be posted.
+            await self.bot.pool.execute(
+                """
+                DELETE FROM anime_channel_outbox AS outbox
+                    USING unnest($1::BIGINT[], $2::INT[], $3::INT[]) AS orphaned (channel_id, anilist_id, episode)
+                    WHERE outbox.channel_id = orphaned.channel_id
+                      AND outbox.anilist_id = orphaned.anilist_id
+                      AND outbox.episode = orphaned.episode
+                """,
+                *channel_outbox_keys(orphaned),
+            )
+
+        if released:
+            # a message can only hold so many embeds, the rest go out with the next batch.
+            await self.bot.pool.execute(
+                """
+                UPDATE anime_channel_outbox AS outbox SET claimed_at = NULL
+                    FROM unnest($1::BIGINT[], $2::INT[], $3::INT[]) AS released (channel_id, anilist_id, episode)
+                    WHERE outbox.channel_id = released.channel_id
+                      AND outbox.anilist_id = released.anilist_id
+                      AND outbox.episode = released.episode
+                """,
+                *channel_outbox_keys(released),
+            )
 
-            await self.send_reminders_out_for(title)
+        report = await post_each(self.bot, messages, limiter=self.dm_limiter)
 
-            self.currently_sleeping_for = None
+        # failed posts stay claimed, and get retried once the claim times out.
+        done = [
+            row
+            for channel_id in (*report.sent, *report.undeliverable)
+            for row in included[channel_id]
+        ]
+        await self.bot.pool.execute(
+            """
+            UPDATE anime_channel_outbox AS outbox SET delivered_at = NOW()
+                FROM unnest($1::BIGINT[], $2::INT[], $3::INT[]) AS done (channel_id, anilist_id, episode)
+                WHERE outbox.channel_id = done.channel_id
+                  AND outbox.anilist_id = done.anilist_id
+                  AND outbox.episode = done.episode
+            """,
+            *channel_outbox_keys(done),
+        )
+
+        if report.undeliverable:
+            # the channel is gone, or the bot can't see (or talk in) it anymore.
+            await self.bot.pool.execute(
+                "DELETE FROM anime_channel_reminders WHERE channel_id = ANY($1::BIGINT[])",
+                report.undeliverable,
+            )
+
+        logger.info(
+            f"Posted {len(report.sent)}/{len(messages)} channel reminders "
+            f"in {report.took:.2f}s, {len(report.failed)} failed and "
+            f"{len(report.undeliverable)} unreachable."
+        )
+
+    @tasks.loop(minutes=1)
+    async def outbox_worker(self):
+        # picks up anything left behind by a restart, or a failed delivery.
+        await self.drain_outbox()
 
-    @user_reminders.before_loop
+        await self.bot.pool.execute(
+            "DELETE FROM anime_airings WHERE airing_at < NOW() - $1::INTERVAL",
+            OUTBOX_RETENTION,
+        )
+
+    @airing_watcher.before_loop
+    @outbox_worker.before_loop
     async def before_reminders_watcher(self):
         await self.bot.wait_until_ready()
 
-    def restart_user_reminders(self):
-        self.user_reminders.restart()
-        self.currently_sleeping_for = None
-
     async def cog_load(self):
-        """
-        self.livechart_watcher.start()
-        self.user_reminders.start()
-        """
+        self.airing_watcher.start()
+        self.outbox_worker.start()
+        self.scheduler.start()
 
     async def cog_unload(self):
-        """
-        self.user_reminders.cancel()
-        self.livechart_watcher.cancel()
+        self.scheduler.stop()
+        self.outbox_worker.cancel()
+        self.airing_watcher.cancel()
 
-        await self.client.session.close()
-        """
+        for task in self._tracking:
+            task.cancel()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from libs.anilist.types import AiringSchedule
+
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing import Iterable
+
+    AiringKey = tuple[int, int]
+
+
+def airing_key(schedule: AiringSchedule) -> AiringKey:
+    return (schedule.media_id, schedule.episode)
+
+
+class ScheduleDiff(NamedTuple):
+    added: list[AiringSchedule]
+    removed: list[AiringSchedule]
+    rescheduled: list[AiringSchedule]
+
+    @property
+    def churn(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.rescheduled)
+
+
+def diff_schedules(
+    old: Iterable[AiringSchedule],
+    new: Iterable[AiringSchedule],
+) -> ScheduleDiff:
+    """
+    Diffs two airing feeds, keyed on the anime and the episode.
+
+    Only changes that affect when a reminder goes out are reported, a changed
+    title or thumbnail isn't an event.
+    """
+
+    previous = {airing_key(schedule): schedule for schedule in old}
+    current = {airing_key(schedule): schedule for schedule in new}
+
+    added: list[AiringSchedule] = []
+    rescheduled: list[AiringSchedule] = []
+
+    for key, schedule in current.items():
+        before = previous.get(key)
+        if not before:
+            added.append(schedule)
+        elif before.airing_at != schedule.airing_at:
+            rescheduled.append(schedule)
+
+    removed = [schedule for key, schedule in previous.items() if key not in current]
+
+    return ScheduleDiff(added=added, removed=removed, rescheduled=rescheduled)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import heapq
+import asyncio
+import itertools
+
+import discord
+
+from .. import logger
+from .schedule import airing_key
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from typing import Awaitable, Callable, Optional
+
+    from libs.anilist.types import AiringSchedule
+
+    from .schedule import AiringKey
+
+
+class ReminderScheduler:
+    """
+    Fires a callback for every airing at its air time, backed by a min-heap.
+
+    A single task sleeps until the earliest airing (or until an earlier one is
+    pushed), then fires everything that's due concurrently. Rescheduled and
+    cancelled airings are dropped lazily when they reach the top of the heap.
+    """
+
+    def __init__(self, callback: Callable[[AiringSchedule], Awaitable[None]]):
+        self.callback = callback
+
+        self._heap: list[tuple[datetime, int, AiringSchedule]] = []
+        self._entries: dict[AiringKey, AiringSchedule] = {}
+        self._counter = itertools.count()  # breaks ties between equal air times
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    def schedule(self, airing: AiringSchedule):
+        """
+        Adds an airing, replacing the previous entry of the same episode.
+        """
+
+        self._entries[airing_key(airing)] = airing
+        entry = (airing.airing_at, next(self._counter), airing)
+        heapq.heappush(self._heap, entry)
+
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+    def cancel(self, airing: AiringSchedule):
+        self._entries.pop(airing_key(airing), None)
+
+    def _fire(self, airing: AiringSchedule):
+        task = asyncio.create_task(self.callback(airing))
+        self._running.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task[None]):
+        self._running.discard(task)
+
+        if not task.cancelled() and (error := task.exception()):
+            logger.exception("Sending out a reminder failed.", exc_info=error)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = discord.utils.utcnow()
+
+            while self._heap and self._heap[0][0] <= now:
+                _, _, airing = heapq.heappop(self._heap)
+
+                # stale entry, the airing was either cancelled or rescheduled.
+                if self._entries.get(airing_key(airing)) is not airing:
+                    continue
+
+                del self._entries[airing_key(airing)]
+                self._fire(airing)
+
+            timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+        for task in self._running:
+            task.cancel()
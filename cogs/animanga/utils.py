@@ -7,15 +7,33 @@ from discord.ext import commands
 import re
 from urllib.parse import quote
 
+from cachetools import LRUCache
+
 from utils.constants import BELL, BOOK, CAMERA, NO_BELL
-from libs.anilist.types import Media, Relation, SearchType
+from libs.anilist.types import Media, QueryProfile, Relation, SearchType
+
+from .. import logger
 
 from typing import TYPE_CHECKING, Optional, Self
 
 if TYPE_CHECKING:
+    from typing import Any
+
     from . import Animanga
     from utils.subclasses import Bot
 
+    RenderKey = tuple[int, int]
+
+# Rendered embeds and relation options, keyed by `render_key`, so repeated
+# lookups of the same title don't rebuild them.
+EMBED_CACHE: LRUCache[RenderKey, dict[str, Any]] = LRUCache(maxsize=512)
+OPTIONS_CACHE: LRUCache[RenderKey, list[discord.SelectOption]] = LRUCache(maxsize=512)
+
+
+def render_key(media: Media) -> RenderKey:
+    # `updatedAt` changes with every edit on AniList, so a stale render is never reused.
+    return (media.id, media.updated_at)
+
 
 class View(ui.View):
     @classmethod
@@ -28,7 +46,10 @@ class View(ui.View):
         view = discord.utils.MISSING
         if media.relations:
             view = view or cls(timeout=None)
-            view.add_item(RelationSelect(media.relations))
+            view.add_item(RelationSelect(media.relations, key=render_key(media)))
+
+            # warm the cache so picking a relation doesn't wait on AniList.
+            bot.anilist.prefetch(relation.id for relation in media.relations)
 
         if media.trailer:
             view = view or cls(timeout=None)
@@ -57,17 +78,36 @@ class RelationSelect(
     ui.DynamicItem[ui.Select[View]],
     template=r"kana:animanga_relations",
 ):
-    def __init__(self, relations: list[Relation]) -> None:
+    def __init__(
+        self,
+        relations: list[Relation],
+        *,
+        key: Optional[RenderKey] = None,
+    ) -> None:
         super().__init__(
             ui.Select[View](
                 placeholder="Related",
                 custom_id="kana:animanga_relations",
-                options=self._to_options(relations),
+                options=self._to_options(relations, key=key),
                 row=1,
             ),
         )
 
-    def _to_options(self, relations: list[Relation]) -> list[discord.SelectOption]:
+    def _to_options(
+        self,
+        relations: list[Relation],
+        *,
+        key: Optional[RenderKey] = None,
+    ) -> list[discord.SelectOption]:
+        if key is None:
+            return self._build_options(relations)
+
+        if (options := OPTIONS_CACHE.get(key)) is None:
+            options = OPTIONS_CACHE[key] = self._build_options(relations)
+
+        return list(options)
+
+    def _build_options(self, relations: list[Relation]) -> list[discord.SelectOption]:
         return [
             discord.SelectOption(
                 label=relation.title,
@@ -88,7 +128,7 @@ class RelationSelect(
         attempt: int = 0,
     ) -> Optional[Media]:
         media = await interaction.client.anilist.fetch(
-            f"x (ID: {search_id})",  # bit jank but who is gonna stop me
+            int(search_id),
             search_type=SearchType.ANIME
             if search_type == "ANIME"
             else SearchType.MANGA,
@@ -96,7 +136,7 @@ class RelationSelect(
 
         if not media and attempt < 3:
             return await self._query_anilist(
-                interaction, search_id, search_type, attempt=attempt
+                interaction, search_id, search_type, attempt=attempt + 1
             )
 
         return media
@@ -163,15 +203,11 @@ class ReminderButton(
         anime_id: int,
         user_id: int,
     ) -> Self:
-        is_active = await bot.pool.fetchval(
-            """
-            SELECT TRUE FROM anime_reminders
-                WHERE anilist_id = $1
-                  AND user_id = $2
-            """,
-            anime_id,
-            user_id,
-        )
+        reminder: Optional[Animanga] = bot.get_cog("Animanga")  # pyright: ignore[reportAssignmentType]
+        if not reminder:
+            raise ValueError("Animanga cog not loaded")
+
+        is_active = await reminder.reminders.is_following(user_id, anime_id)
 
         return cls(is_active, anime_id, user_id)
 
@@ -196,17 +232,30 @@ class ReminderButton(
         match: re.Match[str],
     ) -> Self:
         anime_id, user_id = int(match["anime_id"]), int(match["user_id"])
-        is_active = await interaction.client.pool.fetchval(
-            """
-            SELECT TRUE FROM anime_reminders
-                WHERE anilist_id = $1
-                  AND user_id = $2
-            """,
-            anime_id,
-            user_id,
+        return await cls.for_user(interaction.client, anime_id, user_id)
+
+    async def _airing_details(self, bot: Bot) -> Optional[str]:
+        # only the airing state is needed here, so don't pull the whole embed.
+        media = await bot.anilist.fetch(
+            self.anime_id,
+            search_type=SearchType.ANIME,
+            profile=QueryProfile.AIRING,
         )
 
-        return cls(is_active, anime_id, user_id)
+        if not media:
+            return None
+
+        if not media.next_airing_episode:
+            return (
+                f"Got it! I'll remind you when an episode of **{media.title}** is released, "
+                "though no upcoming episodes are scheduled yet."
+            )
+
+        return (
+            f"Got it! I'll remind you when an episode of **{media.title}** is released, "
+            f"episode {media.next_airing_episode.episode} airs "
+            f"{discord.utils.format_dt(media.next_airing_episode.airing_at, 'R')}."
+        )
 
     async def callback(self, interaction: discord.Interaction[Bot]):  # pyright: ignore[reportIncompatibleMethodOverride]
         assert self.view
@@ -233,14 +282,43 @@ class ReminderButton(
         }
 
         if interaction.response.is_done():
-            await interaction.followup.send(**args)  # type: ignore
+            message = await interaction.followup.send(**args, wait=True)  # type: ignore
         else:
             await interaction.response.send_message(**args)  # type: ignore
+            message = None
+
+        if not is_toggled:
+            return
+
+        # the toggle is already saved and confirmed, so the episode details are
+        # only a nicety, AniList being down shouldn't fail the interaction.
+        try:
+            if details := await self._airing_details(interaction.client):
+                if message:
+                    await message.edit(content=details)
+                else:
+                    await interaction.edit_original_response(content=details)
+        except Exception:
+            logger.warning(
+                f"Couldn't fetch the airing details of {self.anime_id}.", exc_info=True
+            )
 
 
 class AnimangaEmbed(discord.Embed):
     @classmethod
     def from_media(cls, data: Media) -> Self:
+        key = render_key(data)
+        if (payload := EMBED_CACHE.get(key)) is None:
+            payload = EMBED_CACHE[key] = cls._build(data).to_dict()
+
+        # copy the fields (and each field), as they're the only part of the payload
+        # an embed changes in place, i.e. with `add_field` or `set_field_at`.
+        return cls.from_dict(
+            {**payload, "fields": [dict(field) for field in payload.get("fields", [])]}
+        )
+
+    @classmethod
+    def _build(cls, data: Media) -> Self:
         embed = cls(
             title=data.title,
             description=data.description,
@@ -82,7 +82,10 @@ class Doujins(BaseCog):
 
     async def cog_load(self):
         await super().cog_load()
-        self.client = await DoujinClient.new(self.CONFIG["FLARESOLVER_URL"])
+        self.client = await DoujinClient.new(
+            self.CONFIG["FLARESOLVER_URL"],
+            cache=self.bot.cache,
+        )
 
     async def cog_unload(self):
         await super().cog_unload()
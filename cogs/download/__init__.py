@@ -0,0 +1,630 @@
+import discord
+from discord.ext import commands
+
+import asyncio
+import aiohttp
+
+import yt_dlp  # pyright: ignore[reportMissingTypeStubs]
+
+# fmt: off
+from yt_dlp.extractor.youtube import YoutubeIE, YoutubeClipIE  # pyright: ignore[reportMissingTypeStubs]
+from yt_dlp.extractor.pinterest import PinterestIE             # pyright: ignore[reportMissingTypeStubs]
+from yt_dlp.extractor.twitter import TwitterIE                 # pyright: ignore[reportMissingTypeStubs]
+from yt_dlp.extractor.instagram import InstagramIE             # pyright: ignore[reportMissingTypeStubs]
+from yt_dlp.extractor.tiktok import TikTokIE                   # pyright: ignore[reportMissingTypeStubs]
+from yt_dlp.extractor.reddit import RedditIE                   # pyright: ignore[reportMissingTypeStubs]
+from yt_dlp.extractor.twitch import TwitchClipsIE              # pyright: ignore[reportMissingTypeStubs]
+# fmt: on
+
+from yt_dlp.extractor.common import InfoExtractor  # pyright: ignore[reportMissingTypeStubs]
+
+from pathlib import Path
+from time import perf_counter
+from urllib.parse import parse_qs, urlparse
+
+from yt_dlp.utils import parse_duration  # pyright: ignore[reportMissingTypeStubs]
+
+from .. import BaseCog, logger
+from .cache import DownloadCache, attachment_ttl
+from .jobs import DownloadJob, DownloadQueue
+from .stream import ResponseStream
+from .worker import DirectMedia, DownloadOptions, Progress
+
+from typing import TYPE_CHECKING, Literal, NamedTuple, Optional, Annotated, TypedDict
+
+if TYPE_CHECKING:
+    from utils.subclasses import Bot, Context
+
+DEFAULT_UPLOAD_LIMIT = 25 * 1024 * 1024
+
+# how often the status message of a download can be edited, in seconds.
+STATUS_EDIT_INTERVAL = 2.0
+
+STAGE_NAMES = {"transcode": "encode"}
+
+# how much of a cached attachment is held in memory at once, while it's saved.
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024
+
+
+class Match(TypedDict):
+    url: str
+    source: str
+    # where the video should start, from a `t=` in the URL.
+    timestamp: Optional[float]
+
+
+def url_timestamp(url: str) -> Optional[float]:
+    """
+    Reads the start time out of a URL's `t=` (or `start=`), in the query or
+    the fragment, i.e. `?t=83`, `?t=1m23s` or `#t=1:23`.
+    """
+
+    parsed = urlparse(url)
+    for part in (parsed.query, parsed.fragment):
+        params = parse_qs(part)
+        for name in ("t", "start"):
+            if name in params:
+                return parse_duration(params[name][0])
+
+
+class Fetched(NamedTuple):
+    path: Optional[Path]
+    # the key the file is cached under, if it's cached at all.
+    key: Optional[str]
+    cached: bool
+    timings: dict[str, float]
+    # where to stream the file from, when it wasn't downloaded at all.
+    direct: Optional[DirectMedia] = None
+
+
+class Source:
+    """
+    Matches URLs against the extractors of the supported sources.
+
+    The host of a URL is looked up in an index first, so only the patterns of
+    the sources served from that host are run. Anything the index doesn't
+    know (no host at all, or a host it has no entry for) is tried against
+    every source, like the combined pattern used to.
+    """
+
+    def __init__(
+        self,
+        extractors: dict[str, type[InfoExtractor]],
+        hosts: dict[str, list[str]],
+    ):
+        self.extractors = extractors
+
+        # indexed by a label of the host (i.e. `youtube` for `m.youtube.com`),
+        # rather than the full host, so subdomains and other TLDs need no entries.
+        self.index: dict[str, list[str]] = {}
+        for name, labels in hosts.items():
+            for label in labels:
+                self.index.setdefault(label, []).append(name)
+
+    def _fmt_name(self, name: str) -> str:
+        return f"`{name.replace('_', ' ').title()}`"
+
+    def source_names(self):
+        sources = list(self.extractors.keys())
+
+        if len(sources) > 1:
+            return (
+                ", ".join(self._fmt_name(k) for k in sources[:-1])
+                + f" or {self._fmt_name(sources[-1])}"
+            )
+        else:
+            return self._fmt_name(sources[0])
+
+    def candidates(self, url: str) -> list[str]:
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            # not a URL with a host (i.e. a bare YouTube video ID), only the
+            # extractors' own patterns can tell what it is.
+            return list(self.extractors)
+
+        names: list[str] = []
+        for label in host.split("."):
+            names.extend(self.index.get(label, ()))
+
+        # the index only knows the main hosts, the extractors also accept
+        # mirrors (i.e. Invidious instances or `piped.video`) that it doesn't.
+        return names or list(self.extractors)
+
+    def match(self, other: str) -> Optional[Match]:
+        if other.startswith("<"):
+            other = other[1:]
+
+        if other.endswith(">"):
+            other = other[:-1]
+
+        for name in self.candidates(other):
+            # the extractors compile and cache their own patterns.
+            if match := self.extractors[name]._match_valid_url(other):  # pyright: ignore[reportPrivateUsage,reportUnknownMemberType]
+                return {
+                    "url": match.group(0),  # pyright: ignore[reportUnknownMemberType]
+                    "source": name,
+                    "timestamp": url_timestamp(other),
+                }
+
+
+# fmt: off
+EXTRACTORS = {
+    "youtube":       YoutubeIE,
+    "youtube_clips": YoutubeClipIE,
+    "twitter":       TwitterIE,
+    "pinterest":     PinterestIE,
+    "tiktok":        TikTokIE,
+    "instagram":     InstagramIE,
+    "reddit":        RedditIE,
+    "twitch_clips":  TwitchClipsIE,
+}
+
+# the labels of the hosts each source is served from, see `Source`.
+HOSTS = {
+    "youtube":       ["youtube", "youtu", "youtube-nocookie"],
+    "youtube_clips": ["youtube"],
+    "twitter":       ["twitter", "x"],
+    "pinterest":     ["pinterest"],
+    "tiktok":        ["tiktok"],
+    "instagram":     ["instagram"],
+    "reddit":        ["reddit"],
+    "twitch_clips":  ["twitch"],
+}
+# fmt: on
+
+sources = Source(EXTRACTORS, HOSTS)
+
+
+class FileTooLarge(Exception):
+    def __init__(self, limit: int, message: discord.Message, *args: object) -> None:
+        super().__init__(*args)
+        self.limit = limit
+        self.original_message = message
+
+
+class LinkConverter(commands.Converter["Bot"]):
+    async def convert(  # pyright: ignore[reportIncompatibleMethodOverride]
+        self, ctx: "Context", argument: str
+    ):
+        match = sources.match(argument)
+        if match:
+            return match
+        elif "-dev" in ctx.message.content and await ctx.bot.is_owner(ctx.author):
+            return {
+                "source": "unknown",
+                "url": argument,
+                "timestamp": url_timestamp(argument),
+            }
+        else:
+            raise commands.BadArgument(
+                f"No URL found, sources I support are {sources.source_names()}."
+            )
+
+
+class DownloadCommandFlags(commands.FlagConverter, delimiter=" ", prefix="-"):
+    fmt: Literal["mp4", "mp3", "webm"] = commands.flag(
+        description="Video format the downloaded video should be downloaded as.",
+        default="mp4",
+        aliases=["format", "f"],
+    )
+    spoiler: bool = commands.flag(
+        description="Spoilers the sent video.", default=False, aliases=["s", "sp"]
+    )
+    compress: bool = commands.flag(
+        description="Re-encodes the video to fit the upload limit, if it's too large.",
+        default=False,
+        aliases=["c"],
+    )
+    start: Optional[str] = commands.flag(
+        description="Where the clip should start, i.e. `1:23` or `1m23s`.",
+        default=None,
+        aliases=["from"],
+    )
+    end: Optional[str] = commands.flag(
+        description="Where the clip should end, i.e. `1:43` or `1m43s`.",
+        default=None,
+        aliases=["to"],
+    )
+    dev: bool = commands.flag(default=False)
+
+
+def format_took(took: float, timings: dict[str, float], *, cached: bool) -> str:
+    content = f"took: `{round(took, 2)}s`"
+    if cached:
+        return content + " (cached)"
+
+    if timings:
+        stages = ", ".join(
+            f"{STAGE_NAMES.get(stage, stage)}: `{round(seconds, 2)}s`"
+            for stage, seconds in timings.items()
+        )
+        content += f" ({stages})"
+
+    return content
+
+
+def format_progress(progress: Progress) -> str:
+    downloaded = f"{progress.downloaded / 1024**2:.1f}MiB"
+    speed = f", {progress.speed / 1024**2:.1f}MiB/s" if progress.speed else ""
+
+    if not progress.total:
+        return f"downloading... `{downloaded}`{speed}"
+
+    percent = progress.downloaded / progress.total
+    return (
+        f"downloading... `{percent:.0%}` "
+        f"({downloaded}/{progress.total / 1024**2:.1f}MiB{speed})"
+    )
+
+
+class StatusMessage:
+    """
+    Edits a message with the latest status of a download, at most once
+    every `interval` seconds, dropping whatever was superseded in between.
+    """
+
+    def __init__(
+        self,
+        message: discord.Message,
+        *,
+        interval: float = STATUS_EDIT_INTERVAL,
+    ):
+        self.message = message
+        self.interval = interval
+        self._content: Optional[str] = None
+        self._last = 0.0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def update(self, content: str):
+        self._content = content
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        await asyncio.sleep(max(0, self._last + self.interval - perf_counter()))
+
+        content, self._content = self._content, None
+        if content is None:
+            return
+
+        self._last = perf_counter()
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException:
+            pass
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+
+
+def parse_section(
+    data: Match, flags: DownloadCommandFlags
+) -> Optional[tuple[float, float]]:
+    """
+    The `(start, end)` of the part of the video that should be downloaded,
+    `None` for all of it.
+    """
+
+    start, end = data["timestamp"], None
+
+    if flags.start is not None:
+        start = parse_duration(flags.start)
+        if start is None:
+            raise commands.BadArgument(f"`{flags.start}` isn't a valid timestamp.")
+
+    if flags.end is not None:
+        end = parse_duration(flags.end)
+        if end is None:
+            raise commands.BadArgument(f"`{flags.end}` isn't a valid timestamp.")
+
+    if not start and end is None:
+        return None
+
+    start = start or 0
+    end = end if end is not None else float("inf")
+    if end <= start:
+        raise commands.BadArgument("The clip has to end after it starts.")
+
+    return (start, end)
+
+
+def cache_key(
+    data: Match,
+    flags: DownloadCommandFlags,
+    max_filesize: int,
+    section: Optional[tuple[float, float]] = None,
+) -> Optional[str]:
+    """
+    The `extractor:id:format:limit` key a download is cached under, `None` if
+    the video ID can't be read from the URL alone.
+
+    The format is planned to fit the upload limit, so the same video can be a
+    different file for every limit.
+    """
+
+    ie = EXTRACTORS.get(data["source"])
+    if not ie:
+        return None
+
+    video_id = ie.get_temp_id(data["url"])  # pyright: ignore[reportUnknownMemberType]
+    if not video_id:
+        return None
+
+    key = f"{ie.ie_key()}:{video_id}:{flags.fmt}:{max_filesize}"  # pyright: ignore[reportUnknownMemberType]
+    if section:
+        key += f":{section[0]:g}-{section[1]:g}"
+
+    return key
+
+
+class Download(BaseCog):
+    def __init__(self, bot: "Bot") -> None:
+        super().__init__(bot)
+        self.DOWNLOAD_PATH = self.CONFIG["PATH_TO_DOWNLOAD"]
+        self.cache = DownloadCache(
+            Path(self.DOWNLOAD_PATH) / "cache",
+            max_size=self.CONFIG.get("CACHE_SIZE", 2048) * 1024 * 1024,
+        )
+        self.queue = DownloadQueue(workers=self.CONFIG.get("WORKERS", 2))
+
+    async def cog_load(self):
+        self.queue.start()
+
+    async def cog_unload(self):
+        self.queue.stop()
+
+    async def _fetch(
+        self,
+        data: Match,
+        flags: DownloadCommandFlags,
+        *,
+        key: Optional[str],
+        max_filesize: int,
+        ctx: "Context",
+        status: StatusMessage,
+        section: Optional[tuple[float, float]] = None,
+        stream: bool = False,
+    ) -> Fetched:
+        """
+        Gets the file for a download, from the disk cache, then the attachment
+        it was last uploaded as, and only then from the source itself.
+
+        With `stream`, a file that can be uploaded straight from the source
+        isn't downloaded, its `DirectMedia` is returned instead.
+        """
+
+        # a re-encoded file isn't what a plain download gives, so it's cached separately.
+        fit_key = f"{key}:fit" if key else None
+        keys = [key, fit_key] if flags.compress else [key]
+
+        for cached_key in filter(None, keys):
+            if path := self.cache.get(cached_key):
+                if path.stat().st_size < max_filesize:
+                    return Fetched(path, cached_key, True, {})
+
+                # the planned format went over after all, so plan it again.
+                self.cache.discard(cached_key)
+            elif path := await self._from_attachment(
+                cached_key, max_filesize=max_filesize
+            ):
+                return Fetched(path, cached_key, True, {})
+
+        job = DownloadJob(
+            DownloadOptions(
+                url=data["url"],
+                source=data["source"],
+                fmt=flags.fmt,
+                download_path=self.DOWNLOAD_PATH,
+                quiet=not self.bot.config["Bot"]["IS_DEV"],
+                max_filesize=max_filesize,
+                concurrent_fragments=self.CONFIG.get("CONCURRENT_FRAGMENTS", 1),
+                transcode=flags.compress,
+                scratch_path=self.CONFIG.get("SCRATCH_PATH"),
+                section=section,
+                stream=stream,
+            ),
+            user_id=ctx.author.id,
+            guild_id=ctx.guild.id if ctx.guild else None,
+            on_progress=lambda progress: status.update(format_progress(progress)),
+            on_position=lambda position: status.update(
+                f"queued, `#{position}` in line..."
+            ),
+        )
+
+        result = await self.queue.submit(job)
+        if result.direct:
+            return Fetched(None, key, False, result.timings, result.direct)
+
+        if not result.path:
+            return Fetched(None, key, False, result.timings)
+
+        if result.transcoded:
+            key = fit_key
+
+        path = Path(result.path)
+        if key:
+            path = self.cache.put(key, path)
+
+        return Fetched(path, key, False, result.timings)
+
+    async def _from_attachment(self, key: str, *, max_filesize: int) -> Optional[Path]:
+        url: Optional[str] = await self.bot.cache.get("download", key)
+        if not url:
+            return None
+
+        suffix = Path(urlparse(url).path).suffix
+        path = Path(self.DOWNLOAD_PATH) / f"{DownloadCache.digest(key)}{suffix}"
+
+        try:
+            async with self.bot.session.get(url) as resp:
+                if resp.status != 200 or (resp.content_length or 0) >= max_filesize:
+                    return None
+
+                # written as it comes in, so only a chunk is ever held in memory.
+                with path.open("wb") as file:
+                    size = 0
+                    async for chunk in resp.content.iter_chunked(ATTACHMENT_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size >= max_filesize:
+                            raise OSError("The attachment is over the upload limit.")
+
+                        await asyncio.to_thread(file.write, chunk)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+            path.unlink(missing_ok=True)
+            return None
+
+        return self.cache.put(key, path)
+
+    async def _send_direct(
+        self,
+        msg: discord.Message,
+        direct: DirectMedia,
+        *,
+        content: str,
+        spoiler: bool,
+        max_filesize: int,
+    ) -> Optional[discord.Message]:
+        """
+        Uploads a file by piping the source's response straight into the
+        upload, so it never touches the disk.
+
+        Returns `None` if either side failed, so it can be downloaded instead.
+        """
+
+        stream = ResponseStream(
+            self.bot.session,
+            direct.url,
+            headers=direct.headers,
+            name=direct.filename,
+            max_size=max_filesize,
+        )
+
+        try:
+            # opened up front, so a bad response falls back before anything is uploaded.
+            await stream.open()
+            return await msg.edit(
+                content=content,
+                attachments=[discord.File(stream, spoiler=spoiler)],  # pyright: ignore[reportArgumentType]
+            )
+        except discord.HTTPException as err:
+            if err.code == 40005:
+                raise FileTooLarge(max_filesize, msg)
+
+            logger.warning(f"Streaming {direct.url} to Discord failed: {err}")
+            return None
+        except Exception as err:
+            # whatever went wrong, the regular download is still there to fall back on.
+            logger.warning(f"Streaming {direct.url} failed: {err!r}")
+            return None
+        finally:
+            stream.release()
+
+    async def _remember_attachment(self, key: str, message: discord.Message):
+        if not message.attachments:
+            return
+
+        url = message.attachments[0].url
+        if ttl := attachment_ttl(url):
+            await self.bot.cache.set("download", key, url, ttl=ttl)
+
+    @commands.cooldown(1, 10, commands.BucketType.user)
+    @commands.command()
+    @commands.bot_has_permissions(attach_files=True)
+    async def download(
+        self,
+        ctx: "Context",
+        url: Annotated[Match, LinkConverter],
+        *,
+        flags: DownloadCommandFlags,
+    ):
+        """
+        Downloads the provided video and send it to the current channel,
+        Allowed sources are `YouTube`, `Reddit`, `TikTok`, `Twitter`, `Pinterest`, `Twitch` or `Instagram`.
+
+        Parameters
+        -----------
+        url: str
+            The video to download.
+        """
+        msg = await ctx.send("downloading...")
+        limit = ctx.guild.filesize_limit if ctx.guild else DEFAULT_UPLOAD_LIMIT
+        section = parse_section(url, flags)
+        key = cache_key(url, flags, limit, section)
+        status = StatusMessage(msg)
+
+        try:
+            start = perf_counter()
+            path, key, cached, timings, direct = await self._fetch(
+                url,
+                flags,
+                key=key,
+                max_filesize=limit,
+                ctx=ctx,
+                status=status,
+                section=section,
+                stream=self.CONFIG.get("STREAM", True),
+            )
+
+            if direct:
+                status.close()
+                sent = await self._send_direct(
+                    msg,
+                    direct,
+                    content=format_took(perf_counter() - start, timings, cached=False),
+                    spoiler=flags.spoiler,
+                    max_filesize=limit,
+                )
+                if sent:
+                    if key:
+                        await self._remember_attachment(key, sent)
+                    return
+
+                # the source or discord didn't take it, so go through the disk after all.
+                path, key, cached, timings, _ = await self._fetch(
+                    url,
+                    flags,
+                    key=key,
+                    max_filesize=limit,
+                    ctx=ctx,
+                    status=status,
+                    section=section,
+                )
+
+            end = perf_counter()
+        except yt_dlp.utils.DownloadError:  # pyright: ignore[reportUnknownMemberType]
+            status.close()
+            return await msg.edit(
+                content="Could not download the URL. Double check the URL and try again."
+            )
+
+        # nothing should overwrite the final message.
+        status.close()
+
+        if not path:
+            raise FileTooLarge(
+                limit, msg
+            )  # if its not found, its safe to assume it's errored because of the file limit.
+
+        try:
+            msg = await msg.edit(
+                content=format_took(end - start, timings, cached=cached),
+                attachments=[discord.File(path, spoiler=flags.spoiler)],
+            )
+        except discord.HTTPException as err:
+            if (
+                err.code == 40005
+            ):  # if discord somehow still doesn't like my 25MB files, i'd like to let the user know.
+                raise FileTooLarge(limit, msg)
+
+            raise err
+        finally:
+            if not key:
+                path.unlink(missing_ok=True)  # boop
+
+        if key:
+            await self._remember_attachment(key, msg)
+
+
+async def setup(bot: "Bot"):
+    await bot.add_cog(Download(bot))
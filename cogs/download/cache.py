@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import time
+import hashlib
+
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from .. import logger
+
+from typing import NamedTuple, Optional
+
+
+class CachedFile(NamedTuple):
+    path: Path
+    size: int
+
+
+def attachment_ttl(url: str) -> int:
+    """
+    How many seconds are left before a Discord attachment URL expires,
+    read from the hex `ex` timestamp it's signed with.
+    """
+
+    try:
+        expires_at = int(parse_qs(urlparse(url).query)["ex"][0], 16)
+    except (KeyError, IndexError, ValueError):
+        return 0
+
+    return max(0, int(expires_at - time.time()))
+
+
+class DownloadCache:
+    """
+    Finished downloads kept on disk, addressed by `extractor:id:format:limit`.
+
+    Files are named after the hash of their key, so the cache survives a
+    restart by just listing the directory. Once the files go over `max_size`
+    bytes, the least recently used ones are deleted first.
+    """
+
+    def __init__(self, directory: Path, *, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self.size = 0
+        self.entries: OrderedDict[str, CachedFile] = OrderedDict()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def _load(self):
+        # the modification time is bumped on every hit, so it doubles as the LRU order.
+        files = sorted(
+            (path for path in self.directory.iterdir() if path.is_file()),
+            key=lambda path: path.stat().st_mtime,
+        )
+
+        for path in files:
+            size = path.stat().st_size
+            self.entries[path.stem] = CachedFile(path, size)
+            self.size += size
+
+        self._evict()
+        logger.info(
+            f"Loaded {len(self.entries)} cached downloads ({self.size / 1024**2:.1f}MiB)."
+        )
+
+    def get(self, key: str) -> Optional[Path]:
+        digest = self.digest(key)
+        entry = self.entries.get(digest)
+        if not entry:
+            return None
+
+        if not entry.path.exists():
+            self._drop(digest)
+            return None
+
+        self.entries.move_to_end(digest)
+        os.utime(entry.path)
+
+        return entry.path
+
+    def put(self, key: str, path: Path) -> Path:
+        """
+        Moves a finished download into the cache, returning its new path.
+        """
+
+        digest = self.digest(key)
+        target = self.directory / f"{digest}{path.suffix}"
+
+        if digest in self.entries:
+            self._drop(digest)
+
+        path.replace(target)
+        size = target.stat().st_size
+        self.entries[digest] = CachedFile(target, size)
+        self.size += size
+
+        self._evict()
+        return target
+
+    def discard(self, key: str):
+        digest = self.digest(key)
+        if digest in self.entries:
+            self._drop(digest)
+
+    def _drop(self, digest: str):
+        entry = self.entries.pop(digest)
+        self.size -= entry.size
+        entry.path.unlink(missing_ok=True)
+
+    def _evict(self):
+        # the newest file always stays, even if it's larger than the whole cache.
+        while self.size > self.max_size and len(self.entries) > 1:
+            self._drop(next(iter(self.entries)))
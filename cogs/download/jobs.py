@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import multiprocessing
+
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import yt_dlp  # pyright: ignore[reportMissingTypeStubs]
+
+from .. import logger
+from .worker import DownloadOptions, DownloadResult, Progress, download, init_worker
+
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from multiprocessing import Queue
+
+_ids = itertools.count()
+
+
+class DownloadJob:
+    def __init__(
+        self,
+        options: DownloadOptions,
+        *,
+        user_id: int,
+        guild_id: Optional[int],
+        on_progress: Optional[Callable[[Progress], None]] = None,
+        on_position: Optional[Callable[[int], None]] = None,
+    ):
+        self.id = next(_ids)
+        self.options = options
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.on_progress = on_progress
+        self.on_position = on_position
+
+        self.position: Optional[int] = None
+        self.future: asyncio.Future[DownloadResult] = (
+            asyncio.get_running_loop().create_future()
+        )
+
+
+class DownloadQueue:
+    """
+    Runs downloads on a bounded pool of worker processes, so `yt_dlp` (and the
+    ffmpeg it spawns) can't starve the bot.
+
+    Waiting jobs are started round-robin, first across guilds and then across
+    the users within a guild, so one busy user or server can't hold up
+    everyone else.
+    """
+
+    def __init__(self, *, workers: int):
+        self.workers = workers
+        self.running = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._progress: Queue[Optional[Progress]] = self._context.Queue()
+        self._executor = self._new_executor()
+
+        self._waiting: OrderedDict[
+            Optional[int], OrderedDict[int, deque[DownloadJob]]
+        ] = OrderedDict()
+        self._jobs: dict[int, DownloadJob] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._reader: Optional[threading.Thread] = None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            self.workers,
+            mp_context=self._context,
+            initializer=init_worker,
+            initargs=(self._progress,),
+        )
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+
+        def read_progress():
+            while (progress := self._progress.get()) is not None:
+                loop.call_soon_threadsafe(self._dispatch, progress)
+
+        self._reader = threading.Thread(target=read_progress, daemon=True)
+        self._reader.start()
+
+    def stop(self):
+        self._progress.put(None)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        for task in self._tasks:
+            task.cancel()
+
+        # nothing will ever finish these, so don't leave their commands hanging.
+        for job in [*self._jobs.values(), *self.order()]:
+            if not job.future.done():
+                job.future.set_exception(
+                    yt_dlp.utils.DownloadError("The download queue was stopped.")  # pyright: ignore[reportUnknownMemberType]
+                )
+
+        self._waiting.clear()
+
+    def submit(self, job: DownloadJob) -> asyncio.Future[DownloadResult]:
+        users = self._waiting.setdefault(job.guild_id, OrderedDict())
+        users.setdefault(job.user_id, deque()).append(job)
+
+        self._pump()
+        return job.future
+
+    def _next(self) -> Optional[DownloadJob]:
+        if not self._waiting:
+            return None
+
+        guild_id, users = next(iter(self._waiting.items()))
+        user_id, jobs = next(iter(users.items()))
+        job = jobs.popleft()
+
+        if jobs:
+            users.move_to_end(user_id)
+        else:
+            del users[user_id]
+
+        if users:
+            self._waiting.move_to_end(guild_id)
+        else:
+            del self._waiting[guild_id]
+
+        return job
+
+    def order(self) -> list[DownloadJob]:
+        """
+        The waiting jobs, in the order they'll be started.
+        """
+
+        guilds = deque(
+            deque(list(jobs) for jobs in users.values())
+            for users in self._waiting.values()
+        )
+
+        order: list[DownloadJob] = []
+        while guilds:
+            users = guilds.popleft()
+            jobs = users.popleft()
+            order.append(jobs.pop(0))
+
+            if jobs:
+                users.append(jobs)
+            if users:
+                guilds.append(users)
+
+        return order
+
+    def _pump(self):
+        while self.running < self.workers and (job := self._next()):
+            self.running += 1
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        for position, job in enumerate(self.order(), start=1):
+            if job.position != position:
+                job.position = position
+                if job.on_position:
+                    job.on_position(position)
+
+    async def _run(self, job: DownloadJob):
+        loop = asyncio.get_running_loop()
+        self._jobs[job.id] = job
+
+        executor = self._executor
+        try:
+            try:
+                result = await loop.run_in_executor(
+                    executor, download, job.id, job.options
+                )
+            except BrokenProcessPool:
+                # a worker died (i.e. ffmpeg got OOM killed), which takes the whole
+                # pool down with it. The job is tried once more on a fresh one.
+                logger.warning(f"Download pool broke during download {job.id}.")
+                self._replace_executor(executor)
+                result = await loop.run_in_executor(
+                    self._executor, download, job.id, job.options
+                )
+        except Exception as err:
+            if not job.future.done():
+                job.future.set_exception(err)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            del self._jobs[job.id]
+            self.running -= 1
+            self._pump()
+
+    def _replace_executor(self, broken: ProcessPoolExecutor):
+        # the other jobs that were running on it might've replaced it already.
+        if self._executor is not broken:
+            return
+
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+
+    def _dispatch(self, progress: Progress):
+        job = self._jobs.get(progress.job_id)
+        if not job or not job.on_progress:
+            return
+
+        try:
+            job.on_progress(progress)
+        except Exception:
+            logger.exception(f"Progress callback of download {job.id} failed.")
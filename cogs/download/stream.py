@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import io
+import asyncio
+
+import aiohttp
+
+from typing import Any, Optional
+
+
+class ResponseStream(io.RawIOBase):
+    """
+    A read-only file over the body of a URL, so `discord.File` can upload a
+    video straight from its source without it touching the disk.
+
+    aiohttp reads upload bodies from a thread, so every read just waits on the
+    next part of the body from the event loop. Only what the response has
+    buffered is ever held in memory, which is bounded by aiohttp's read limit
+    rather than the size of the file.
+
+    It can only be rewound to the start (i.e. when discord.py retries the
+    request), which requests the body again on the next read. Reading raises
+    `OSError` once more than `max_size` bytes come in.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        *,
+        headers: dict[str, str],
+        name: str,
+        max_size: int,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        super().__init__()
+        self.session = session
+        self.url = url
+        self.headers = headers
+        self.name = name
+        self.max_size = max_size
+        self.loop = loop or asyncio.get_running_loop()
+        self.position = 0
+
+        self._response: Optional[aiohttp.ClientResponse] = None
+        self._rewind = False
+
+    async def open(self):
+        """
+        Requests the body from the start, raising `OSError` if the source
+        doesn't serve it or it's too large.
+        """
+
+        self.release()
+        self._response = response = await self.session.get(
+            self.url, headers=self.headers
+        )
+        self.position = 0
+
+        if response.status != 200:
+            raise OSError(f"The source responded with a {response.status}.")
+
+        if (response.content_length or 0) >= self.max_size:
+            raise OSError(f"The response is larger than {self.max_size} bytes.")
+
+    def release(self):
+        if self._response:
+            self._response.release()
+            self._response = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if (whence, offset) in ((io.SEEK_SET, self.position), (io.SEEK_CUR, 0)):
+            return self.position
+
+        if (whence, offset) != (io.SEEK_SET, 0):
+            raise io.UnsupportedOperation("The response can only be rewound.")
+
+        # this is called from the event loop, so the request is left to the next read.
+        self._rewind = True
+        self.position = 0
+        return 0
+
+    def _wait(self, coroutine: Any) -> Any:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        # blocking on the event loop from the event loop would never return.
+        if running is self.loop:
+            coroutine.close()
+            raise RuntimeError("ResponseStream can only be read from another thread.")
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # pyright: ignore[reportIncompatibleMethodOverride]
+        if self._rewind or not self._response:
+            self._rewind = False
+            self._wait(self.open())
+
+        assert self._response
+        chunk: bytes = self._wait(self._response.content.read(len(buffer)))
+
+        self.position += len(chunk)
+        if self.position > self.max_size:
+            raise OSError(f"The response is larger than {self.max_size} bytes.")
+
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
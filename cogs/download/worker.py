@@ -0,0 +1,510 @@
+"""
+Everything that runs inside the download worker processes, it can't touch the
+bot, and whatever goes in or out of it has to be picklable.
+"""
+
+from __future__ import annotations
+
+import os
+import copy
+import random
+import subprocess
+import time
+
+import yt_dlp  # pyright: ignore[reportMissingTypeStubs]
+
+from pathlib import Path
+
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from multiprocessing import Queue
+
+# how often a single download reports its progress, in seconds.
+PROGRESS_INTERVAL = 1.0
+
+# set by `init_worker` when the worker process starts.
+_progress: Optional[Queue[Progress]] = None
+
+
+class Progress(NamedTuple):
+    job_id: int
+    downloaded: int
+    total: Optional[int]
+    speed: Optional[float]
+
+
+class DownloadOptions(NamedTuple):
+    url: str
+    source: str
+    fmt: str
+    download_path: str
+    quiet: bool
+    max_filesize: int
+    concurrent_fragments: int
+    transcode: bool = False
+    # where intermediate files go (i.e. a tmpfs), defaults to `download_path`.
+    scratch_path: Optional[str] = None
+    # only this `(start, end)` part of the video is downloaded, in seconds.
+    section: Optional[tuple[float, float]] = None
+    # hand back the source URL instead of downloading, when it can be uploaded as is.
+    stream: bool = False
+
+
+class DirectMedia(NamedTuple):
+    url: str
+    headers: dict[str, str]
+    size: int
+    filename: str
+
+
+class DownloadResult(NamedTuple):
+    path: Optional[str]
+    # how long each stage took, in seconds.
+    timings: dict[str, float]
+    transcoded: bool = False
+    # set instead of `path` when the file should be streamed from its source.
+    direct: Optional[DirectMedia] = None
+
+
+def init_worker(progress: Queue[Progress]):
+    global _progress
+    _progress = progress
+
+
+def _progress_hook(job_id: int):
+    last = 0.0
+
+    def hook(data: dict[str, Any]):
+        nonlocal last
+
+        now = time.monotonic()
+        if (
+            not _progress
+            or data["status"] != "downloading"
+            or now - last < PROGRESS_INTERVAL
+        ):
+            return
+
+        last = now
+        _progress.put(
+            Progress(
+                job_id,
+                data.get("downloaded_bytes") or 0,
+                data.get("total_bytes") or data.get("total_bytes_estimate"),
+                data.get("speed"),
+            )
+        )
+
+    return hook
+
+
+# leaves room for the container overhead, which the format sizes don't include.
+SIZE_HEADROOM = 0.97
+
+# the bitrate `FFmpegExtractAudio` encodes to, in kbps.
+AUDIO_QUALITY = 192
+
+# what's downloaded when the video has to be re-encoded anyway, there's no
+# point in pulling a 4K source just to squeeze it into a few megabytes.
+TRANSCODE_SOURCE_FORMAT = "bestvideo[height<=720]+bestaudio/best[height<=720]/best"
+
+# below this the video isn't worth watching, so it's not even attempted (in kbps).
+MIN_VIDEO_BITRATE = 150
+
+# how much larger than the upload limit the source of a re-encode can be.
+TRANSCODE_SOURCE_RATIO = 16
+
+# the extension audio-only formats have in each container, i.e. MP4 audio is `m4a`.
+AUDIO_EXTS = {"mp4": "m4a"}
+
+# the major brand Discord's players are happy with, twitter's videos come
+# with one that some clients refuse to play.
+MP4_BRAND = "mp42"
+
+
+def estimate_size(entry: dict[str, Any], duration: Optional[float]) -> Optional[float]:
+    """
+    The size of a format in bytes, from what the extractor reported or from
+    its bitrate over the whole video, `None` if there's no way to tell.
+    """
+
+    if size := entry.get("filesize") or entry.get("filesize_approx"):
+        return size
+
+    if (tbr := entry.get("tbr")) and duration:
+        return tbr * 1000 / 8 * duration
+
+
+def section_length(data: DownloadOptions, duration: float) -> Optional[float]:
+    if not data.section:
+        return None
+
+    start, end = data.section
+    return max(0, min(end, duration) - start)
+
+
+def plan_format(info: dict[str, Any], data: DownloadOptions) -> Optional[str]:
+    """
+    Picks the best format (or video and audio pair) that fits in the upload
+    limit, before anything is downloaded.
+
+    Returns `None` if nothing fits, or the default selector if the sizes
+    can't be estimated at all.
+    """
+
+    budget = data.max_filesize * SIZE_HEADROOM
+    duration = info.get("duration")
+
+    # the reported sizes are of the whole video, so scale them down to the section.
+    scale = 1.0
+    if duration and (length := section_length(data, duration)):
+        scale = length / duration
+
+    if data.fmt in ("mp3",):
+        if duration and AUDIO_QUALITY * 1000 / 8 * duration * scale > budget:
+            return None
+
+        return "bestaudio/best"
+
+    audio_ext = AUDIO_EXTS.get(data.fmt, data.fmt)
+    default = f"bestvideo+bestaudio[ext={audio_ext}]/best"
+
+    # formats are sorted worst to best, so the index doubles as the quality rank.
+    videos: list[tuple[int, dict[str, Any]]] = []
+    audios: list[tuple[int, dict[str, Any]]] = []
+    combined: list[tuple[int, dict[str, Any]]] = []
+    for rank, entry in enumerate(info.get("formats") or []):
+        has_video = entry.get("vcodec") not in (None, "none")
+        has_audio = entry.get("acodec") not in (None, "none")
+
+        if has_video and has_audio:
+            combined.append((rank, entry))
+        elif has_video:
+            videos.append((rank, entry))
+        elif has_audio:
+            audios.append((rank, entry))
+
+    # prefer audio in the requested container, like the default selector does.
+    audios = [audio for audio in audios if audio[1].get("ext") == audio_ext] or audios
+
+    best: Optional[tuple[tuple[int, int], str]] = None
+    unknown = True
+
+    for rank, entry in combined:
+        size = estimate_size(entry, duration)
+        if size is None:
+            continue
+
+        unknown = False
+        if size * scale <= budget and (not best or (rank, rank) > best[0]):
+            best = ((rank, rank), entry["format_id"])
+
+    for video_rank, video in videos:
+        video_size = estimate_size(video, duration)
+        if video_size is None:
+            continue
+
+        for audio_rank, audio in reversed(audios):
+            audio_size = estimate_size(audio, duration)
+            if audio_size is None:
+                continue
+
+            unknown = False
+            if (video_size + audio_size) * scale > budget:
+                continue
+
+            rank = (video_rank, audio_rank)
+            if not best or rank > best[0]:
+                best = (rank, f"{video['format_id']}+{audio['format_id']}")
+
+            # the audio is walked best first, so this is the best pair for this video.
+            break
+
+    if unknown:
+        return default
+
+    return best[1] if best else None
+
+
+def direct_media(
+    ydl: yt_dlp.YoutubeDL, info: dict[str, Any], data: DownloadOptions
+) -> Optional[DirectMedia]:
+    """
+    Where the selected format can be fetched from as is, if it's a single file
+    served over plain HTTP, with an exact size that fits and nothing left to
+    do to it after the download.
+    """
+
+    # these all need the file on disk, to be converted, cut or remuxed.
+    if data.fmt in ("mp3",) or data.section or data.source == "twitter":
+        return None
+
+    # resolves the selector without downloading, on a copy since it's processed again.
+    selected: dict[str, Any] = ydl.process_ie_result(  # pyright: ignore
+        copy.deepcopy(info), download=False
+    )
+
+    # a video and audio pair is two files, and HLS/DASH come in fragments.
+    if selected.get("requested_formats"):
+        return None
+
+    if selected.get("protocol") not in ("http", "https"):
+        return None
+
+    size = selected.get("filesize")
+    if not size or size >= data.max_filesize:
+        return None
+
+    headers = dict(selected.get("http_headers") or {})
+    if cookies := ydl.cookiejar.get_cookie_header(selected["url"]):  # pyright: ignore
+        headers["Cookie"] = cookies
+
+    return DirectMedia(
+        selected["url"], headers, size, f"{selected['id']}.{selected['ext']}"
+    )
+
+
+def transcode_bitrates(max_filesize: int, duration: float) -> Optional[tuple[int, int]]:
+    """
+    The video and audio bitrates (in kbps) a re-encode should aim for to land
+    right under `max_filesize`, `None` if the video would end up unwatchable.
+    """
+
+    total = max_filesize * SIZE_HEADROOM * 8 / duration / 1000
+    audio = 128 if total > 1000 else 64
+    video = int(total - audio)
+    if video < MIN_VIDEO_BITRATE:
+        return None
+
+    return video, audio
+
+
+def transcode_to_fit(
+    source: Path,
+    output: Path,
+    *,
+    max_filesize: int,
+    duration: float,
+) -> bool:
+    """
+    Re-encodes a video with a two-pass H.264 encode, aiming for a bitrate that
+    lands right under `max_filesize`.
+
+    Returns whether the result actually fits.
+    """
+
+    bitrates = transcode_bitrates(max_filesize, duration)
+    if not bitrates:
+        return False
+
+    video, audio = bitrates
+
+    passlog = str(output.with_suffix(".passlog"))
+    encode = ["ffmpeg", "-y", "-i", str(source), "-c:v", "libx264", "-b:v", f"{video}k"]
+
+    try:
+        subprocess.run(
+            [
+                *encode,
+                *("-pass", "1", "-passlogfile", passlog),
+                *("-an", "-f", "null", os.devnull),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        subprocess.run(
+            [
+                *encode,
+                *("-pass", "2", "-passlogfile", passlog),
+                *("-c:a", "aac", "-b:a", f"{audio}k"),
+                *("-movflags", "+faststart", str(output)),
+            ],
+            check=True,
+            capture_output=True,
+        )
+    except subprocess.CalledProcessError as err:
+        output.unlink(missing_ok=True)
+        raise yt_dlp.utils.DownloadError(  # pyright: ignore[reportUnknownMemberType]
+            f"Transcoding failed: {err.stderr.decode(errors='replace')[-500:]}"
+        )
+    finally:
+        for log in output.parent.glob(f"{output.with_suffix('.passlog').name}*"):
+            log.unlink(missing_ok=True)
+
+    if output.stat().st_size >= max_filesize:
+        output.unlink(missing_ok=True)
+        return False
+
+    return True
+
+
+def remux(source: Path, output: Path):
+    """
+    Stream copies a video into a regular MP4 with the `mp42` brand, the same
+    `ffmpeg -c copy -map 0 -brand mp42` the Exec postprocessor used to run.
+
+    `source` is expected to be in the scratch directory, so writing `output`
+    is the only time the video is written to the download directory.
+    """
+
+    try:
+        subprocess.run(
+            [
+                *("ffmpeg", "-y", "-i", str(source)),
+                *("-c", "copy", "-map", "0", "-brand", MP4_BRAND, str(output)),
+            ],
+            check=True,
+            capture_output=True,
+        )
+    except subprocess.CalledProcessError as err:
+        output.unlink(missing_ok=True)
+        raise yt_dlp.utils.DownloadError(  # pyright: ignore[reportUnknownMemberType]
+            f"Remuxing failed: {err.stderr.decode(errors='replace')[-500:]}"
+        )
+    finally:
+        source.unlink(missing_ok=True)
+
+
+def download(job_id: int, data: DownloadOptions) -> DownloadResult:
+    _id = random.randint(0, 1000)
+    isAudio = data.fmt in ("mp3",)
+    remuxing = data.source == "twitter" and not isAudio
+
+    options = {
+        "outtmpl": data.download_path + f"{_id}_%(id)s.%(ext)s",
+        "quiet": data.quiet,
+        "merge_output_format": data.fmt,
+        "max_filesize": data.max_filesize,
+        "concurrent_fragment_downloads": data.concurrent_fragments,
+        "progress_hooks": [_progress_hook(job_id)],
+    }
+
+    if data.source == "tiktok":
+        options["format_sort"] = ["vcodec:h264"]
+
+    if data.source == "twitter":
+        options["cookies"] = "cookies.txt"
+
+    if data.section:
+        # only the fragments (or byte ranges) covering the section are fetched,
+        # and the cuts are moved to keyframes so the clip doesn't start frozen.
+        options["download_ranges"] = yt_dlp.utils.download_range_func(  # pyright: ignore[reportUnknownMemberType]
+            None, [data.section]
+        )
+        options["force_keyframes_at_cuts"] = True
+
+    if data.scratch_path:
+        # fragments and the separate streams are only written there, the
+        # merged file is the only thing that lands in `download_path`.
+        options["paths"] = {"temp": data.scratch_path}
+
+    if remuxing:
+        # the download is only an input to `remux`, so it goes to the scratch
+        # directory as well, and the remux writes the final file.
+        options["outtmpl"] = os.path.join(
+            data.scratch_path or data.download_path, f"{_id}_%(id)s.source.%(ext)s"
+        )
+
+    if isAudio:
+        options["format"] = "bestaudio/best"
+        options.setdefault("postprocessors", []).append(  # pyright: ignore[reportUnknownMemberType,reportAttributeAccessIssue]  # screw u pyright let me golf in peace
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": data.fmt,
+                "preferredquality": "192",
+            }
+        )
+    else:
+        options["format"] = (
+            f"bestvideo+bestaudio[ext={AUDIO_EXTS.get(data.fmt, data.fmt)}]/best"
+        )
+
+    start = time.perf_counter()
+    timings: dict[str, float] = {}
+    transcode = False
+
+    with yt_dlp.YoutubeDL(  # pyright: ignore[reportUnknownMemberType]
+        options
+    ) as ydl:
+        info: dict[str, Any] = ydl.extract_info(data.url, download=False)  # pyright: ignore
+        timings["extract"] = time.perf_counter() - start
+        start = time.perf_counter()
+
+        if "formats" in info:
+            selector = plan_format(info, data)
+            if not selector:
+                # nothing fits, so don't download anything unless it's getting
+                # re-encoded, and it's short enough to be watchable once it is.
+                duration = info.get("duration")
+                if not (
+                    data.transcode
+                    and data.fmt == "mp4"
+                    and duration
+                    and transcode_bitrates(
+                        data.max_filesize, section_length(data, duration) or duration
+                    )
+                ):
+                    return DownloadResult(None, {})
+
+                selector = TRANSCODE_SOURCE_FORMAT
+                transcode = True
+                ydl.params["max_filesize"] = (  # pyright: ignore
+                    data.max_filesize * TRANSCODE_SOURCE_RATIO
+                )
+
+            ydl.format_selector = ydl.build_format_selector(selector)  # pyright: ignore
+            if (
+                data.stream
+                and not transcode
+                and (direct := direct_media(ydl, info, data))
+            ):
+                return DownloadResult(None, timings, direct=direct)
+
+            info = ydl.process_ie_result(info, download=True)  # pyright: ignore
+        else:
+            # not a single video (i.e. a playlist), so there's nothing to plan.
+            info = ydl.extract_info(data.url)  # pyright: ignore
+
+    timings["download"] = time.perf_counter() - start
+
+    path = Path(
+        f"{data.download_path}{_id}_{info['id']}.{data.fmt if isAudio else info['ext']}"
+    )
+    downloaded = path
+    if remuxing:
+        downloaded = Path(data.scratch_path or data.download_path) / (
+            f"{_id}_{info['id']}.source.{info['ext']}"
+        )
+
+    if not downloaded.exists():
+        return DownloadResult(None, timings)
+
+    if transcode:
+        start = time.perf_counter()
+        output = path.with_name(f"{path.stem}.fit.mp4")
+
+        # the re-encode writes a regular MP4 anyway, so there's no need to remux.
+        try:
+            fits = transcode_to_fit(
+                downloaded,
+                output,
+                max_filesize=data.max_filesize,
+                duration=section_length(data, info["duration"]) or info["duration"],
+            )
+        finally:
+            downloaded.unlink(missing_ok=True)
+
+        timings["transcode"] = time.perf_counter() - start
+        return DownloadResult(str(output) if fits else None, timings, transcoded=True)
+
+    if remuxing:
+        start = time.perf_counter()
+        remux(downloaded, path)
+        timings["remux"] = time.perf_counter() - start
+
+    if path.stat().st_size < data.max_filesize:
+        return DownloadResult(str(path), timings)
+
+    path.unlink(missing_ok=True)
+    return DownloadResult(None, timings)
@@ -20,6 +20,7 @@ if TYPE_CHECKING:
 
 
 POKETWO_ID = 716390085896962058
+POKEMON_TABLE_TTL = 60 * 60 * 24
 HINT_RE = re.compile("The pokémon is (?P<hint>.*).")
 CATCH_RE = re.compile(
     "Congratulations <@!?(?P<catcher>[0-9]+)>! You caught a level (?P<level>[0-9]{1,2}) (?P<name>[a-zA-Zé. ]+)!(?: Added to Pokédex. You received (?P<reward>[0-9]+) Pokécoins!)?"
@@ -56,7 +57,13 @@ class Pokemon(BaseCog):
             "fr": "\U0001f1eb\U0001f1f7",
         }
 
-    async def build_pokemon_table(self):
+    async def build_pokemon_table(self, *, use_cache: bool = True):
+        if use_cache:
+            cached = await self.bot.cache.get("poketwo", "pokemon_table")
+            if cached:
+                self.pokemon_table = cached
+                return
+
         async with self.bot.session.get(
             "https://raw.githubusercontent.com/poketwo/data/master/csv/pokemon.csv"
         ) as req:
@@ -85,6 +92,10 @@ class Pokemon(BaseCog):
             }
             self.pokemon_table = final
 
+        await self.bot.cache.set(
+            "poketwo", "pokemon_table", final, ttl=POKEMON_TABLE_TTL
+        )
+
     async def cog_load(self) -> None:
         await self.build_pokemon_table()
 
@@ -167,7 +178,7 @@ class Pokemon(BaseCog):
         """
         msg = await ctx.send("rebuilding cache...")
         start = time.perf_counter()
-        await self.build_pokemon_table()
+        await self.build_pokemon_table(use_cache=False)
         end = time.perf_counter()
 
         await msg.edit(content=f"rebuilt cache (took: `{end - start:.2}s`)")
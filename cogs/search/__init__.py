@@ -70,7 +70,7 @@ class SpotifySearch(BaseCog):
     def __init__(self, bot: "Bot") -> None:
         super().__init__(bot)
         self.SPOTIFY_EMOJI = self.CONFIG["Emojis"]["SPOTIFY"]
-        self.spotify = SpotifyClient(self.bot.session)
+        self.spotify = SpotifyClient(self.bot.session, cache=self.bot.cache)
 
     @commands.group(name="spotify", aliases=["sp"], invoke_without_command=True)
     @commands.cooldown(3, 1, commands.BucketType.user)
@@ -108,17 +108,17 @@ class SpotifySearch(BaseCog):
         for item in resp:
             items.append(
                 {
-                    "label": item["track_name"],
-                    "value": item["track_url"],
-                    "description": " · ".join(
-                        [artist["name"] for artist in item["artists"]]
-                    )[:100],
+                    "label": item.track_name,
+                    "value": item.track_url,
+                    "description": " · ".join([artist.name for artist in item.artists])[
+                        :100
+                    ],
                     "emoji": self.SPOTIFY_EMOJI,
                 }
             )
 
         view = ResultView(items, ctx.author.id)
-        view.original_message = await ctx.send(resp[0]["track_url"], view=view)
+        view.original_message = await ctx.send(resp[0].track_url, view=view)
 
     @_spotify.command(name="artist", aliases=["art", "a"])
     @commands.cooldown(3, 1, commands.BucketType.user)
@@ -141,14 +141,14 @@ class SpotifySearch(BaseCog):
         for item in resp:
             items.append(
                 {
-                    "label": item["name"],
-                    "value": item["url"],
+                    "label": item.name,
+                    "value": item.url,
                     "emoji": self.SPOTIFY_EMOJI,
                 }
             )
 
         view = ResultView(items, ctx.author.id)
-        view.original_message = await ctx.send(resp[0]["url"], view=view)
+        view.original_message = await ctx.send(resp[0].url, view=view)
 
     @_spotify.command(name="playlist", aliases=["playlists", "pl"])
     @commands.cooldown(3, 1, commands.BucketType.user)
@@ -171,14 +171,14 @@ class SpotifySearch(BaseCog):
         for item in resp:
             items.append(
                 {
-                    "label": item["name"],
-                    "value": item["url"],
+                    "label": item.name,
+                    "value": item.url,
                     "emoji": self.SPOTIFY_EMOJI,
                 }
             )
 
         view = ResultView(items, ctx.author.id)
-        view.original_message = await ctx.send(resp[0]["url"], view=view)
+        view.original_message = await ctx.send(resp[0].url, view=view)
 
     @_spotify.command(name="album", aliases=["albums", "al"])
     @commands.cooldown(3, 1, commands.BucketType.user)
@@ -201,14 +201,14 @@ class SpotifySearch(BaseCog):
         for item in resp:
             items.append(
                 {
-                    "label": item["name"],
-                    "value": item["url"],
+                    "label": item.name,
+                    "value": item.url,
                     "emoji": self.SPOTIFY_EMOJI,
                 }
             )
 
         view = ResultView(items, ctx.author.id)
-        view.original_message = await ctx.send(resp[0]["url"], view=view)
+        view.original_message = await ctx.send(resp[0].url, view=view)
 
     @_spotify.command(name="podcast", aliases=["podcasts", "p", "pd", "pod"])
     @commands.cooldown(3, 1, commands.BucketType.user)
@@ -231,14 +231,14 @@ class SpotifySearch(BaseCog):
         for item in resp:
             items.append(
                 {
-                    "label": item["name"],
-                    "value": item["url"],
+                    "label": item.name,
+                    "value": item.url,
                     "emoji": self.SPOTIFY_EMOJI,
                 }
             )
 
         view = ResultView(items, ctx.author.id)
-        view.original_message = await ctx.send(resp[0]["url"], view=view)
+        view.original_message = await ctx.send(resp[0].url, view=view)
 
 
 class Search(SpotifySearch): ...
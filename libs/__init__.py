@@ -1,3 +1,9 @@
 import logging
 
 logger = logging.getLogger("discord")
+
+
+class InvalidResponse(Exception):
+    """
+    Raised when an upstream response doesn't match the schema it's decoded into.
+    """
@@ -1 +1 @@
-from .client import AniList as AniList
\ No newline at end of file
+from .client import AniList as AniList
@@ -1,94 +1,265 @@
 from discord import Interaction, app_commands
 from aiohttp import ClientSession
 
-from typing import Any, Optional, TYPE_CHECKING
+import json
+import asyncio
+
+from datetime import datetime
+
+from cachetools import TTLCache
+
+from typing import (
+    Any,
+    Iterable,
+    Literal,
+    Optional,
+    TYPE_CHECKING,
+    TypeVar,
+    overload,
+)
 
 from utils import cutoff
 
+from .. import InvalidResponse, logger
+
 from .utils import QUERY_PATTERN
 from .types import (
+    AiringSchedule,
     SearchType,
+    QueryProfile,
     Media,
-    MediaResponse,
+    SearchResult,
+    AiringMedia,
+    RelationPreview,
 )
 
 if TYPE_CHECKING:
+    from utils.cache import Cache
     from utils.subclasses import Bot
 
-SEARCH_QUERY = """
-query ($search: String, $type: MediaType) {
-  Page(perPage: 10) {
-    media(search: $search, type: $type, sort: POPULARITY_DESC) {
+T = TypeVar("T", Media, SearchResult, AiringMedia, RelationPreview)
+
+# The fields requested for each `QueryProfile`, every call site should pick
+# the smallest profile that covers what it actually renders.
+PROFILE_FIELDS = {
+    QueryProfile.AUTOCOMPLETE: """
       id
       title {
         romaji
       }
-    }
+""",
+    QueryProfile.AIRING: """
+      id
+      title {
+        romaji
+        native
+      }
+      status
+      coverImage {
+        large
+      }
+      nextAiringEpisode {
+        airingAt
+        episode
+      }
+""",
+    QueryProfile.RELATION_PREVIEW: """
+      id
+      title {
+        romaji
+      }
+      type
+      relations {
+        edges {
+          relationType(version: 2)
+          node {
+            id
+            title {
+              romaji
+            }
+            type
+          }
+        }
+      }
+""",
+    QueryProfile.EMBED: """
+      title {
+        romaji
+      }
+      coverImage {
+        extraLarge
+        color
+      }
+      trailer {
+        site
+        id
+      }
+      description(asHtml: false)
+      nextAiringEpisode {
+        id
+      }
+      episodes
+      id
+      type
+      genres
+      averageScore
+      chapters
+      status
+      bannerImage
+      siteUrl
+      isAdult
+      updatedAt
+      relations {
+        edges {
+          relationType(version: 2)
+          node {
+            id
+            title {
+              romaji
+            }
+            type
+          }
+        }
+      }
+      studios {
+        edges {
+          node {
+            name
+            siteUrl
+          }
+          isMain
+        }
+      }
+""",
+}
+
+PROFILE_TYPES = {
+    QueryProfile.AUTOCOMPLETE: SearchResult,
+    QueryProfile.AIRING: AiringMedia,
+    QueryProfile.RELATION_PREVIEW: RelationPreview,
+    QueryProfile.EMBED: Media,
+}
+
+SEARCH_QUERY = """
+query ($search: String, $type: MediaType) {
+  Page(perPage: 10) {
+    media(search: $search, type: $type, sort: POPULARITY_DESC) {%s}
   }
 }
 """
 
-FETCH_QUERY = """
-query ($search: %s, $type: MediaType) {
-  Media(%s: $search, type: $type, sort: POPULARITY_DESC) {
-    title {
-      romaji
-    }
-    coverImage {
-      extraLarge
-      color
+AIRING_SCHEDULE_QUERY = """
+query ($page: Int, $ids: [Int], $after: Int, $before: Int) {
+  Page(page: $page, perPage: 50) {
+    pageInfo {
+      hasNextPage
     }
-    trailer {
-      site
+    airingSchedules(
+      mediaId_in: $ids
+      airingAt_greater: $after
+      airingAt_lesser: $before
+      sort: TIME
+    ) {
       id
-    }
-    description(asHtml: false)
-    nextAiringEpisode {
-      id
-    }
-    episodes
-    id
-    genres
-    averageScore
-    duration
-    chapters
-    status
-    bannerImage
-    siteUrl
-    isAdult
-    relations {
-      edges {
-        relationType(version: 2)
-        node {
-          id
-          title {
-            romaji
-          }
-          type
+      episode
+      airingAt
+      media {
+        id
+        title {
+          romaji
+          native
         }
-      }
-    }
-    studios {
-      edges {
-        node {
-          name
-          siteUrl
+        coverImage {
+          large
         }
-        isMain
       }
     }
   }
 }
 """
 
+WATCHLIST_QUERY = """
+query ($page: Int, $user: String) {
+  Page(page: $page, perPage: 50) {
+    pageInfo {
+      hasNextPage
+    }
+    mediaList(userName: $user, type: ANIME, status: CURRENT) {
+      media {%s}
+    }
+  }
+}
+"""
+
+FETCH_MANY_QUERY = """
+query ($ids: [Int]) {
+  Page(perPage: 50) {
+    media(id_in: $ids) {%s}
+  }
+}
+"""
+
+FETCH_QUERY = """
+query ($search: %s, $type: MediaType) {
+  Media(%s: $search, type: $type, sort: POPULARITY_DESC) {%s}
+}
+"""
+
+
+def format_query(
+    query: str | int,
+    profile: QueryProfile = QueryProfile.EMBED,
+) -> tuple[str, Optional[str | int]]:
+    fields = PROFILE_FIELDS[profile]
+    if isinstance(query, int):
+        return (FETCH_QUERY % ("Int", "id", fields), query)
 
-def format_query(query: str) -> tuple[str, Optional[str]]:
     match = QUERY_PATTERN.fullmatch(query)
     if match:
-        return (FETCH_QUERY % ("Int", "id"), match.groups()[0])
+        return (FETCH_QUERY % ("Int", "id", fields), match.groups()[0])
+
+    return (FETCH_QUERY % ("String", "search", fields), None)
+
+
+def cache_key(
+    profile: QueryProfile,
+    search_type: SearchType,
+    search: str | int,
+    animanga_id: Optional[str | int] = None,
+) -> str:
+    if animanga_id:
+        return f"{profile.name}:{search_type.name}:id:{animanga_id}"
+
+    return f"{profile.name}:{search_type.name}:{str(search).lower()}"
+
+
+def decode(
+    cls: type[T],
+    data: Any,
+    *,
+    search_type: SearchType,
+) -> T:
+    try:
+        return cls.from_data(data, search_type=search_type)  # type: ignore
+    except (KeyError, TypeError, ValueError) as err:
+        raise InvalidResponse(
+            f"AniList returned a payload that doesn't fit {cls.__name__!r}."
+        ) from err
+
+
+# How long a fetched result for each profile is cached for, in seconds.
+CACHE_TTL = {
+    QueryProfile.AUTOCOMPLETE: 60 * 60 * 24,
+    QueryProfile.AIRING: 60 * 10,
+    QueryProfile.RELATION_PREVIEW: 60 * 60 * 24,
+    QueryProfile.EMBED: 60 * 60,
+}
 
-    return (FETCH_QUERY % ("String", "search"), None)
+# The most related Series prefetched for a single message.
+MAX_PREFETCH = 10
 
+# How many prefetched IDs are remembered, they're forgotten once their cache entry expires.
+MAX_PREFETCHED = 4096
 
 BASE_URL = "https://graphql.anilist.co/"
 SEARCH_TYPE = {
@@ -98,8 +269,19 @@ SEARCH_TYPE = {
 
 
 class AniList:
-    def __init__(self, session: ClientSession):
+    def __init__(self, session: ClientSession, *, cache: Optional["Cache"] = None):
         self.session = session
+        self.cache = cache
+
+        # prefetching is low priority, so only one batch is in flight at a time.
+        self._prefetch_lock = asyncio.Lock()
+        self._prefetch_tasks: set[asyncio.Task[None]] = set()
+        # expires with the EMBED entries, so anything in it is still in the cache.
+        self._prefetched: TTLCache[int, bool] = TTLCache(
+            maxsize=MAX_PREFETCHED, ttl=CACHE_TTL[QueryProfile.EMBED]
+        )
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
 
     @staticmethod
     async def query(
@@ -124,7 +306,7 @@ class AniList:
                     f"Recieved a non 200 response: {req.status=} \n{await req.text()}"
                 )
 
-            data = await req.json()
+            data = json.loads(await req.read())
 
             if data.get("errors"):
                 raise Exception(
@@ -140,7 +322,8 @@ class AniList:
         current: str,
     ) -> list[app_commands.Choice[str]]:
         """
-        A wrapper around the `search` function for slash auto-complete.
+        A wrapper around the `search` function for slash auto-complete, the
+        search type is taken from the name of the command's parent group.
 
         Parameteres
         ------------
@@ -156,42 +339,71 @@ class AniList:
             and interaction.command.parent
         )
 
-        req = await cls.query(
-            interaction.client.session,
-            SEARCH_QUERY,
-            variables={
-                "search": current or None,
-            },
+        return await cls.search_choices(
+            interaction,
+            current,
             search_type=SEARCH_TYPE[interaction.command.parent.name],
         )
 
-        data = req.get("Page", {}).get("media")
-        if not data:
-            return []
+    @classmethod
+    async def anime_auto_complete(
+        cls,
+        interaction: Interaction["Bot"],
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        """
+        Like `search_auto_complete`, but always searches for Anime, for
+        commands that aren't directly under the `anime` group.
+        """
+
+        return await cls.search_choices(
+            interaction,
+            current,
+            search_type=SearchType.ANIME,
+        )
+
+    @classmethod
+    async def search_choices(
+        cls,
+        interaction: Interaction["Bot"],
+        current: str,
+        *,
+        search_type: SearchType,
+    ) -> list[app_commands.Choice[str]]:
+        results = await cls.search(
+            interaction.client.session,
+            current,
+            search_type=search_type,
+        )
 
         return [
             app_commands.Choice(
-                name=cutoff(media["title"]["romaji"], 100),
+                name=cutoff(media.title, 100),
                 value=cutoff(
-                    media["title"]["romaji"],
+                    media.title,
                     100,
-                    ending=f" (ID: {media['id']})",
+                    ending=f" (ID: {media.id})",
                 ),
             )
-            for media in data
+            for media in results
         ]
 
-    async def fetch(
-        self,
+    @classmethod
+    async def search(
+        cls,
+        session: ClientSession,
         search: str,
         *,
         search_type: SearchType,
-    ) -> Optional[Media]:
+    ) -> list[SearchResult]:
         """
-        Fetches information about a Series.
+        Searches for Series, only fetching the fields needed to list them.
 
         Parameteres
         ------------
+        session: ClientSession
+            The session to query AniList with.
+
         search: str
             The search query.
 
@@ -199,7 +411,94 @@ class AniList:
             An Enum of either ANIME or MANGA.
         """
 
-        query, animanga_id = format_query(search)
+        req = await cls.query(
+            session,
+            SEARCH_QUERY % PROFILE_FIELDS[QueryProfile.AUTOCOMPLETE],
+            variables={
+                "search": search or None,
+            },
+            search_type=search_type,
+        )
+
+        data = req.get("Page", {}).get("media")
+        if not data:
+            return []
+
+        return [decode(SearchResult, media, search_type=search_type) for media in data]
+
+    @overload
+    async def fetch(
+        self,
+        search: str | int,
+        *,
+        search_type: SearchType,
+        profile: Literal[QueryProfile.EMBED] = ...,
+    ) -> Optional[Media]: ...
+
+    @overload
+    async def fetch(
+        self,
+        search: str | int,
+        *,
+        search_type: SearchType,
+        profile: Literal[QueryProfile.RELATION_PREVIEW],
+    ) -> Optional[RelationPreview]: ...
+
+    @overload
+    async def fetch(
+        self,
+        search: str | int,
+        *,
+        search_type: SearchType,
+        profile: Literal[QueryProfile.AIRING],
+    ) -> Optional[AiringMedia]: ...
+
+    @overload
+    async def fetch(
+        self,
+        search: str | int,
+        *,
+        search_type: SearchType,
+        profile: Literal[QueryProfile.AUTOCOMPLETE],
+    ) -> Optional[SearchResult]: ...
+
+    async def fetch(
+        self,
+        search: str | int,
+        *,
+        search_type: SearchType,
+        profile: QueryProfile = QueryProfile.EMBED,
+    ) -> Any:
+        """
+        Fetches information about a Series.
+
+        Parameteres
+        ------------
+        search: str | int
+            The search query, or the AniList ID of the Series.
+
+        search_type: SearchType
+            An Enum of either ANIME or MANGA.
+
+        profile: QueryProfile
+            Which fields to request, this decides the returned type.
+            Defaults to `QueryProfile.EMBED`, which returns a full `Media`.
+        """
+
+        query, animanga_id = format_query(search, profile)
+        key = cache_key(profile, search_type, search, animanga_id)
+
+        if self.cache:
+            cached = await self.cache.get("anilist", key)
+
+            if animanga_id and int(animanga_id) in self._prefetched:
+                if cached:
+                    self.prefetch_hits += 1
+                else:
+                    self.prefetch_misses += 1
+
+            if cached:
+                return cached
 
         req = await self.query(
             self.session,
@@ -210,11 +509,194 @@ class AniList:
             search_type=search_type,
         )
 
-        data: Optional[MediaResponse] = req.get("Media")
+        data = req.get("Media")
         if not data:
             return None
 
-        return Media.from_data(
+        media = decode(
+            PROFILE_TYPES[profile],
             data,
             search_type=search_type,
         )
+
+        if self.cache:
+            await self.cache.set("anilist", key, media, ttl=CACHE_TTL[profile])
+
+        return media
+
+    async def fetch_many(self, media_ids: Iterable[int]) -> list[Media]:
+        """
+        Fetches multiple Series by their IDs in a single request.
+
+        Parameteres
+        ------------
+        media_ids: Iterable[int]
+            The AniList IDs of the Series, at most 50 of them.
+        """
+
+        req = await self.query(
+            self.session,
+            FETCH_MANY_QUERY % PROFILE_FIELDS[QueryProfile.EMBED],
+            variables={
+                "ids": list(media_ids),
+            },
+        )
+
+        data = (req.get("Page") or {}).get("media")
+        if not data:
+            return []
+
+        return [
+            decode(Media, media, search_type=SearchType[media["type"]])
+            for media in data
+        ]
+
+    @property
+    def prefetch_hit_rate(self) -> float:
+        total = self.prefetch_hits + self.prefetch_misses
+        return self.prefetch_hits / total if total else 0.0
+
+    def prefetch(self, media_ids: Iterable[int]) -> None:
+        """
+        Schedules a background fetch of the given Series into the cache, so a
+        later `fetch` by their ID doesn't have to wait on AniList.
+
+        Parameteres
+        ------------
+        media_ids: Iterable[int]
+            The AniList IDs of the Series, only the first `MAX_PREFETCH` are used.
+        """
+
+        if not self.cache:
+            return
+
+        ids = [media_id for media_id in media_ids if media_id not in self._prefetched]
+        if not ids:
+            return
+
+        task = asyncio.create_task(self._prefetch(ids[:MAX_PREFETCH]))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+
+    async def _prefetch(self, media_ids: list[int]) -> None:
+        assert self.cache
+
+        async with self._prefetch_lock:
+            try:
+                media = await self.fetch_many(media_ids)
+            except Exception as err:
+                logger.debug(f"Failed to prefetch {media_ids}: {err}")
+                return
+
+            for item in media:
+                await self.cache.set(
+                    "anilist",
+                    cache_key(QueryProfile.EMBED, item.type, item.id, item.id),
+                    item,
+                    ttl=CACHE_TTL[QueryProfile.EMBED],
+                )
+
+                self._prefetched[item.id] = True
+
+        logger.debug(
+            f"Prefetched {len(media)}/{len(media_ids)} related media, "
+            f"hit rate so far: {self.prefetch_hit_rate:.0%}"
+        )
+
+    async def fetch_airing_schedules(
+        self,
+        media_ids: Iterable[int],
+        *,
+        after: datetime,
+        before: datetime,
+    ) -> list[AiringSchedule]:
+        """
+        Fetches the episodes of the given Series that air within a time window,
+        paging through the results in bulk.
+
+        Parameteres
+        ------------
+        media_ids: Iterable[int]
+            The AniList IDs of the Series to fetch the schedules for.
+
+        after: datetime
+            Only include episodes airing after this.
+
+        before: datetime
+            Only include episodes airing before this.
+        """
+
+        ids = list(media_ids)
+        if not ids:
+            return []
+
+        schedules: list[AiringSchedule] = []
+        page = 1
+
+        while True:
+            req = await self.query(
+                self.session,
+                AIRING_SCHEDULE_QUERY,
+                variables={
+                    "page": page,
+                    "ids": ids,
+                    "after": int(after.timestamp()),
+                    "before": int(before.timestamp()),
+                },
+            )
+
+            data = req.get("Page") or {}
+            try:
+                schedules.extend(
+                    AiringSchedule.from_data(schedule)
+                    for schedule in data.get("airingSchedules") or []
+                )
+            except (KeyError, TypeError) as err:
+                raise InvalidResponse(
+                    "AniList returned a payload that doesn't fit 'AiringSchedule'."
+                ) from err
+
+            if not (data.get("pageInfo") or {}).get("hasNextPage"):
+                return schedules
+
+            page += 1
+
+    async def fetch_airing_watchlist(self, user_name: str) -> list[AiringMedia]:
+        """
+        Fetches the Anime an AniList user is currently watching that still
+        have episodes to air, paging through their list in bulk.
+
+        Parameteres
+        ------------
+        user_name: str
+            The name of the AniList user.
+        """
+
+        watching: list[AiringMedia] = []
+        page = 1
+
+        while True:
+            req = await self.query(
+                self.session,
+                WATCHLIST_QUERY % PROFILE_FIELDS[QueryProfile.AIRING],
+                variables={
+                    "page": page,
+                    "user": user_name,
+                },
+            )
+
+            data = req.get("Page") or {}
+            for entry in data.get("mediaList") or []:
+                media = decode(
+                    AiringMedia,
+                    entry.get("media"),
+                    search_type=SearchType.ANIME,
+                )
+
+                if media.next_airing_episode:
+                    watching.append(media)
+
+            if not (data.get("pageInfo") or {}).get("hasNextPage"):
+                return watching
+
+            page += 1
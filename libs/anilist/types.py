@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import TypedDict, Literal, Optional, NamedTuple
 
 from enum import Enum
@@ -11,6 +11,13 @@ class SearchType(Enum):
     MANGA = 2
 
 
+class QueryProfile(Enum):
+    EMBED = 1
+    RELATION_PREVIEW = 2
+    AIRING = 3
+    AUTOCOMPLETE = 4
+
+
 class StudioNode(TypedDict):
     name: str
     siteUrl: str
@@ -56,6 +63,48 @@ class ParsedNode(TypedDict):
     mediaId: int
 
 
+class RawAiringEpisode(TypedDict):
+    airingAt: int
+    episode: int
+
+
+class AiringCoverImage(TypedDict):
+    large: str
+
+
+class AiringScheduleMedia(TypedDict):
+    id: int
+    title: dict[Literal["romaji", "native"], Optional[str]]
+    coverImage: AiringCoverImage
+
+
+class AiringScheduleResponse(TypedDict):
+    id: int
+    episode: int
+    airingAt: int
+    media: AiringScheduleMedia
+
+
+class SearchResponse(TypedDict):
+    id: int
+    title: dict[Literal["romaji"], str]
+
+
+class AiringResponse(TypedDict):
+    id: int
+    title: dict[Literal["romaji", "native"], Optional[str]]
+    status: str
+    coverImage: AiringCoverImage
+    nextAiringEpisode: Optional[RawAiringEpisode]
+
+
+class RelationPreviewResponse(TypedDict):
+    id: int
+    title: dict[Literal["romaji"], str]
+    type: Literal["ANIME"] | Literal["MANGA"]
+    relations: RawRelations
+
+
 class MediaResponse(TypedDict):
     id: int
     title: dict[Literal["romaji"], str]
@@ -65,7 +114,6 @@ class MediaResponse(TypedDict):
     genres: list[str]
     averageScore: int
     episodes: Optional[int]
-    duration: Optional[int]
     chapters: Optional[int]
     status: Literal["FINISHED", "RELEASING", "NOT_YET_RELEASED", "CANCELLED", "HIATUS"]
     bannerImage: str
@@ -73,6 +121,7 @@ class MediaResponse(TypedDict):
     isAdult: bool
     studios: RawStudios
     relations: RawRelations
+    updatedAt: Optional[int]
 
 
 class Studios(NamedTuple):
@@ -83,14 +132,14 @@ class Studios(NamedTuple):
 
     @classmethod
     def from_edge(cls, edge: StudioEdge):
-        name = edge.get("node", {}).get("name", "N/A")
-        url = edge.get("node", {}).get("siteUrl", "N/A")
+        node = edge["node"]
+        name, url = node["name"], node["siteUrl"]
 
         return cls(
             name=name,
             url=url,
             formatted=f"[{name}]({url})",
-            main=edge.get("isMain", False),
+            main=edge["isMain"],
         )
 
 
@@ -119,7 +168,6 @@ class Media(NamedTuple):
     cover_image: str
     description: str
     episodes: Optional[int]
-    duration: Optional[int]
     genres: list[str]
     is_adult: bool
     site_url: str
@@ -130,6 +178,8 @@ class Media(NamedTuple):
     type: SearchType
     studios: list[Studios]
     relations: list[Relation]
+    # when AniList last changed the entry, defaulted so older pickles still load.
+    updated_at: int = 0
 
     @staticmethod
     def _create_trailer_url(data: Trailer) -> str:
@@ -147,38 +197,142 @@ class Media(NamedTuple):
         *,
         search_type: SearchType,
     ) -> "Media":
-        description = cleanup_html(data.get("description", ""))
-        title = data.get("title", {}).get("romaji", "N/A")
+        # every requested field is always present in a GraphQL response (even if
+        # it's `null`), so index directly and let a schema mismatch raise.
+        cover_image = data["coverImage"]
+        trailer = data["trailer"]
+        relations = data["relations"]
+        studios = data["studios"]
+
+        return cls(
+            id=data["id"],
+            average_score=data["averageScore"] or "N/A",
+            banner_image=data["bannerImage"],
+            chapters=data["chapters"],
+            color=cover_image["color"],
+            cover_image=cover_image["extraLarge"],
+            description=cleanup_html(data["description"] or ""),
+            episodes=data["episodes"],
+            genres=data["genres"] or [],
+            is_adult=data["isAdult"] or False,
+            site_url=data["siteUrl"],
+            status=(data["status"] or "N/A").title().replace("_", " "),
+            title=data["title"]["romaji"] or "N/A",
+            trailer=cls._create_trailer_url(trailer) if trailer else None,
+            next_airing_episode=data["nextAiringEpisode"],
+            type=search_type,
+            studios=[Studios.from_edge(edge) for edge in studios["edges"]]
+            if studios
+            else [],
+            relations=[Relation.from_edge(edge) for edge in relations["edges"]]
+            if relations
+            else [],
+            updated_at=data["updatedAt"] or 0,
+        )
+
+
+class SearchResult(NamedTuple):
+    id: int
+    title: str
+
+    @classmethod
+    def from_data(
+        cls,
+        data: SearchResponse,
+        *,
+        search_type: SearchType,
+    ) -> "SearchResult":
+        return cls(
+            id=data["id"],
+            title=data["title"]["romaji"] or "N/A",
+        )
+
+
+class AiringEpisode(NamedTuple):
+    episode: int
+    airing_at: datetime
+
+    @classmethod
+    def from_data(cls, data: RawAiringEpisode) -> "AiringEpisode":
+        return cls(
+            episode=data["episode"],
+            airing_at=datetime.fromtimestamp(data["airingAt"], tz=timezone.utc),
+        )
+
+
+class AiringMedia(NamedTuple):
+    id: int
+    title: str
+    native_title: Optional[str]
+    status: str
+    cover_image: Optional[str]
+    next_airing_episode: Optional[AiringEpisode]
+
+    @classmethod
+    def from_data(
+        cls,
+        data: AiringResponse,
+        *,
+        search_type: SearchType,
+    ) -> "AiringMedia":
+        next_episode = data["nextAiringEpisode"]
+
+        return cls(
+            id=data["id"],
+            title=data["title"]["romaji"] or "N/A",
+            native_title=data["title"]["native"],
+            status=(data["status"] or "N/A").title().replace("_", " "),
+            cover_image=data["coverImage"]["large"],
+            next_airing_episode=AiringEpisode.from_data(next_episode)
+            if next_episode
+            else None,
+        )
 
-        trailer = cls._create_trailer_url(data["trailer"]) if data["trailer"] else None
 
-        relations = [
-            Relation.from_edge(edge)
-            for edge in data.get("relations", {}).get("edges", [])
-        ]
+class RelationPreview(NamedTuple):
+    id: int
+    title: str
+    type: SearchType
+    relations: list[Relation]
 
-        studios = [
-            Studios.from_edge(edge) for edge in data.get("studios", {}).get("edges", [])
-        ]
+    @classmethod
+    def from_data(
+        cls,
+        data: RelationPreviewResponse,
+        *,
+        search_type: SearchType,
+    ) -> "RelationPreview":
+        relations = data["relations"]
 
         return cls(
             id=data["id"],
-            average_score=data.get("averageScore") or "N/A",
-            banner_image=data.get("bannerImage"),
-            chapters=data.get("chapters"),
-            color=data.get("coverImage", {}).get("color"),
-            cover_image=data.get("coverImage", {}).get("extraLarge"),
-            description=description,
-            episodes=data.get("episodes"),
-            duration=data.get("duration"),
-            genres=data.get("genres", []),
-            is_adult=data.get("isAdult", False),
-            site_url=data.get("siteUrl"),
-            status=data.get("status", "N/A").title().replace("_", " "),
-            title=title,
-            trailer=trailer,
-            next_airing_episode=data.get("nextAiringEpisode"),
+            title=data["title"]["romaji"] or "N/A",
             type=search_type,
-            studios=studios,
-            relations=relations,
+            relations=[Relation.from_edge(edge) for edge in relations["edges"]]
+            if relations
+            else [],
+        )
+
+
+class AiringSchedule(NamedTuple):
+    id: int
+    media_id: int
+    episode: int
+    airing_at: datetime
+    title: str
+    native_title: Optional[str]
+    thumbnail: Optional[str]
+
+    @classmethod
+    def from_data(cls, data: AiringScheduleResponse) -> "AiringSchedule":
+        media = data["media"]
+
+        return cls(
+            id=data["id"],
+            media_id=media["id"],
+            episode=data["episode"],
+            airing_at=datetime.fromtimestamp(data["airingAt"], tz=timezone.utc),
+            title=media["title"]["romaji"] or "N/A",
+            native_title=media["title"]["native"],
+            thumbnail=media["coverImage"]["large"],
         )
@@ -2,40 +2,89 @@ from __future__ import annotations
 
 import re
 
+from cachetools import LRUCache
+
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Optional
 
 QUERY_PATTERN = re.compile(
     r".* \(ID: ([0-9]+)\)",
 )
 
+# Matches a single opening or closing tag, the text between tags is never
+# scanned by the pattern so there's no backtracking over the description.
 TAG_PATTERN = re.compile(
-    r"\<(?P<tag>[a-zA-Z]+)(?: href=\"(?P<url>.*)\")?\>(?:(?P<text>[\s\S]+?)\<\/\1\>)?",
-    flags=re.M | re.S | re.U,
+    r"<(?P<closing>/)?(?P<tag>[a-zA-Z]+)(?:\s+href=\"(?P<url>[^\"]*)\")?[^>]*>",
 )
 
+# Rendered descriptions keyed by the raw HTML they came from, so an edit on
+# AniList is a miss rather than a stale hit.
+DESCRIPTION_CACHE: LRUCache[str, str] = LRUCache(maxsize=1024)
 
-def formatter(match: re.Match[Any]) -> str:
-    items = match.groupdict()
 
-    match items["tag"]:
+def formatter(tag: str, text: str, url: Optional[str]) -> str:
+    match tag:
         case "a":
-            return f"[{items['text']}]({items['url']})"
-        case "br":
-            return "\n"
+            return f"[{text}]({url})"
         case "i":
-            return f"*{items['text']}*"
+            return f"*{text}*" if text else ""
         case "b":
-            return f"**{items['text']}**"
+            return f"**{text}**" if text else ""
         case _:
-            return items["text"]
+            return text
+
+
+def to_markdown(description: str) -> str:
+    """
+    Converts AniList's HTML into Discord markdown in a single pass.
+
+    Text is buffered into `parts`, each open tag remembers where its content
+    starts in that buffer so a closing tag only has to join its own content.
+    Unclosed tags keep their text and stray closing tags are dropped.
+    """
+
+    parts: list[str] = []
+    stack: list[tuple[str, Optional[str], int]] = []
+    position = 0
+
+    for match in TAG_PATTERN.finditer(description):
+        parts.append(description[position : match.start()])
+        position = match.end()
+
+        tag = match["tag"].lower()
+        if tag == "br":
+            parts.append("\n")
+            continue
+
+        if not match["closing"]:
+            stack.append((tag, match["url"], len(parts)))
+            continue
+
+        for depth in range(len(stack) - 1, -1, -1):
+            if stack[depth][0] == tag:
+                break
+        else:
+            continue
+
+        _, url, start = stack[depth]
+        del stack[depth:]
+
+        text = "".join(parts[start:])
+        del parts[start:]
+        parts.append(formatter(tag, text, url))
+
+    parts.append(description[position:])
+    return "".join(parts)
 
 
 def cleanup_html(description: str) -> str:
-    final, no = TAG_PATTERN.subn(formatter, description)
-    if no > 0:
-        return cleanup_html(final)
+    cached = DESCRIPTION_CACHE.get(description)
+    if cached is not None:
+        return cached
+
+    final = to_markdown(description).replace("\n\n", "\n")
+    DESCRIPTION_CACHE[description] = final
 
-    return final.replace("\n\n", "\n")
+    return final
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import aiohttp  # pyright: ignore[reportMissingTypeStubs]
+import json
 
+from .. import InvalidResponse
 from .types import Gallery
 from .constants import BASE_URL
 
@@ -10,6 +12,11 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from typing import Any, Optional
 
+    from utils.cache import Cache
+
+# galleries are immutable once uploaded, so they can be cached for a while.
+CACHE_TTL = 60 * 60 * 24 * 7
+
 
 class Route:
     def __init__(
@@ -40,18 +47,27 @@ class DoujinClient:
         self,
         session: aiohttp.ClientSession,
         flare_solver: str,
+        *,
+        cache: Optional[Cache] = None,
     ) -> None:
         self.FLARE_SOLVER = flare_solver
         self.session = session
+        self.cache = cache
         self.query_metadata: Any = {}
 
     @classmethod
-    async def new(cls, flare_solver: str) -> DoujinClient:
+    async def new(
+        cls,
+        flare_solver: str,
+        *,
+        cache: Optional[Cache] = None,
+    ) -> DoujinClient:
         session = aiohttp.ClientSession()
 
         return cls(
             session=session,
             flare_solver=flare_solver,
+            cache=cache,
         )
 
     async def _renew_cloudflare_token(
@@ -106,12 +122,17 @@ class DoujinClient:
                     f"Recieved an {req.status} while trying to query {route.path!r}"
                 )
 
-            return await req.json()
+            return json.loads(await req.read())
 
     async def fetch_doujin(
         self,
         doujin: int,
     ) -> Optional[Gallery]:
+        if self.cache:
+            cached = await self.cache.get("doujins", str(doujin))
+            if cached:
+                return cached
+
         route = Route(
             BASE_URL,
             "/api/gallery/{doujin}",
@@ -124,4 +145,14 @@ class DoujinClient:
         if not data:
             return
 
-        return Gallery.from_data(data)
+        try:
+            gallery = Gallery.from_data(data)
+        except (KeyError, TypeError) as err:
+            raise InvalidResponse(
+                f"Gallery {doujin!r} didn't match the expected schema."
+            ) from err
+
+        if self.cache:
+            await self.cache.set("doujins", str(doujin), gallery, ttl=CACHE_TTL)
+
+        return gallery
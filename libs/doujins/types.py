@@ -79,13 +79,11 @@ class Gallery(NamedTuple):
 
     @staticmethod
     def _construct_urls(nedia_id: int, image: list[Image]) -> list[str]:
-        output: list[str] = []
-        for idx, img in enumerate(image):
-            output.append(
-                f"{CDN_URL}/galleries/{nedia_id}/{idx + 1}.{FORMATS.get(img['t'], 'png')}"
-            )
-
-        return output
+        base = f"{CDN_URL}/galleries/{nedia_id}/"
+        return [
+            f"{base}{idx}.{FORMATS.get(img['t'], 'png')}"
+            for idx, img in enumerate(image, start=1)
+        ]
 
     @staticmethod
     def _parse_tags(tags: list[TagResponse]) -> dict[str, list[Tag]]:
@@ -12,12 +12,13 @@ from .types import (
     Podcast,
     Song,
     Artist,
-    Topic,
 )
 
 if TYPE_CHECKING:
     from aiohttp import ClientSession
 
+    from utils.cache import Cache
+
 
 class InvalidToken(Exception): ...
 
@@ -53,111 +54,34 @@ class SearchType(Enum):
 # fmt: on
 
 
-def parse_url(raw: str) -> Optional[str]:
-    cnt = raw.split(":")
-    if len(cnt) > 2:
-        domain, *rest = cnt
-        return f"https://open.{domain}.com/{'/'.join(rest)}"
-
-
-def parse_artist_obj(payload: dict[str, Any]) -> Optional[Artist]:
-    if payload:
-        return {  # type: ignore
-            "name": payload.get("profile", {}).get("name"),
-            "url": parse_url(payload.get("uri", "")),
-            "is_verified": payload.get("profile", {}).get("verified", None),
-        }
-
-
-def parse_album_obj(payload: dict[str, Any]) -> Optional[Album]:
-    if payload:
-        return {
-            "name": payload.get("name", "N/A"),
-            "url": parse_url(payload.get("uri", "")),
-            "artists": list(
-                map(
-                    parse_artist_obj,
-                    payload.get("artists", {}).get("items", []),  # type: ignore
-                )
-            ),
-        }
-
-
-def parse_playlist_obj(payload: dict[str, Any]) -> Optional[Playlist]:
-    if payload:
-        data = {
-            "name": payload.get("name"),
-            "url": parse_url(payload.get("uri", "")),
-            "description": payload.get("description", ""),
-        }
-
-        owner = payload.get("ownerV2", {}).get("data")
-        if owner:
-            data["owner"] = {
-                "username": owner.get("username"),
-                "display_name": owner.get("name"),
-                "url": parse_url(owner.get("uri", "")),
-            }
-
-        return data  # type: ignore
-
-
-def parse_podcast_obj(payload: dict[str, Any]) -> Optional[Podcast]:
-    p = payload["data"]
-
-    return {  # type: ignore
-        "name": p["name"],
-        "url": parse_url(p["uri"]),
-        "publisher": p.get("publisher", {}).get("name", "UNKNOWN"),
-        "topics": map(parse_topic, p.get("topics", {}).get("items", [])),
-    }
-
-
 def parse_songs(payload: dict[str, Any]) -> Optional[Song]:
-    track: dict[str, Any] = payload.get("item", {}).get("data", {})
+    track = (payload.get("item") or {}).get("data")
     if track:
-        return {
-            "track_name": track.get("name"),
-            "track_url": parse_url(track.get("uri", "")),
-            "album": parse_album_obj(track.get("albumOfTrack", {})),  # type: ignore
-            "artists": list(
-                map(
-                    parse_artist_obj,
-                    track.get("artists", {}).get("items", []),  # type: ignore
-                )
-            ),
-        }
+        return Song.from_data(track)
 
 
-def parse_topic(payload: dict[str, Any]) -> Optional[Topic]:
-    if payload:
-        return {  # type: ignore
-            "title": payload["title"],
-            "url": parse_url(payload["uri"]),
-        }
-
-
-def parse_artists(payload: dict[str, Any]):
+def parse_artists(payload: dict[str, Any]) -> Optional[Artist]:
     artist = payload.get("data")
     if artist:
-        return parse_artist_obj(artist)
+        return Artist.from_data(artist)
 
 
-def parse_albums(payload: dict[str, Any]):
+def parse_albums(payload: dict[str, Any]) -> Optional[Album]:
     album = payload.get("data")
     if album:
-        return parse_album_obj(album)
+        return Album.from_data(album)
 
 
-def parse_playlists(payload: dict[str, Any]):
+def parse_playlists(payload: dict[str, Any]) -> Optional[Playlist]:
     playlist = payload.get("data")
     if playlist:
-        return parse_playlist_obj(playlist)
+        return Playlist.from_data(playlist)
 
 
 def parse_podcast(payload: dict[str, Any]) -> Optional[Podcast]:
-    if payload:
-        return parse_podcast_obj(payload)  # type: ignore
+    podcast = payload.get("data")
+    if podcast:
+        return Podcast.from_data(podcast)
 
 
 strategy = {
@@ -169,9 +93,14 @@ strategy = {
 }
 
 
+# search results don't change much, so they're cached for a day.
+CACHE_TTL = 60 * 60 * 24
+
+
 class SpotifyClient:
-    def __init__(self, session: "ClientSession"):
+    def __init__(self, session: "ClientSession", *, cache: Optional["Cache"] = None):
         self.session = session
+        self.cache = cache
         self.token: Optional[AccessToken] = None
 
     @overload
@@ -201,6 +130,24 @@ class SpotifyClient:
 
     async def search(
         self, query: str, *, search_type: SearchType, offset: int = 0, limit: int = 10
+    ) -> Any:
+        key = f"{search_type.name}:{offset}:{limit}:{query.lower()}"
+        if self.cache:
+            cached = await self.cache.get("spotify", key)
+            if cached is not None:
+                return cached
+
+        resp = await self._search_with_token(
+            query, search_type=search_type, offset=offset, limit=limit
+        )
+
+        if self.cache and resp:
+            await self.cache.set("spotify", key, resp, ttl=CACHE_TTL)
+
+        return resp
+
+    async def _search_with_token(
+        self, query: str, *, search_type: SearchType, offset: int, limit: int
     ) -> Any:
         if (self.token is None) or (
             self.token["accessTokenExpirationTimestampMs"]
@@ -255,7 +202,9 @@ class SpotifyClient:
             elif req.status != 200:
                 raise Exception(await req.text())
 
-            raw_data = await req.json()
+            # decode straight from the response bytes, skips `aiohttp` building
+            # an intermediate `str` of the whole body first.
+            raw_data = json.loads(await req.read())
             if raw_data.get(
                 "errors"
             ):  # for some reason spotify still returns a 200 for errors.
@@ -273,7 +222,21 @@ class SpotifyClient:
             if not strat:
                 raise NotImplementedError
 
-            return list(map(strat, data.get("items")))  # type: ignore
+            results: list[Any] = []
+            for item in data.get("items", []):
+                # a malformed item only costs that item, not the whole search.
+                try:
+                    parsed = strat(item)
+                except (KeyError, TypeError, ValueError) as err:
+                    logger.warning(
+                        f"Skipping an unexpected {search_type.name} item from Spotify: {err!r}"
+                    )
+                    continue
+
+                if parsed:
+                    results.append(parsed)
+
+            return results
 
     async def renew_token(self) -> None:
         async with self.session.get("https://open.spotify.com/get_access_token") as req:
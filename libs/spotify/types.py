@@ -1,4 +1,11 @@
-from typing import Optional, TypedDict
+from typing import Any, NamedTuple, Optional, Self, TypedDict
+
+
+def parse_url(raw: str) -> Optional[str]:
+    cnt = raw.split(":")
+    if len(cnt) > 2:
+        domain, *rest = cnt
+        return f"https://open.{domain}.com/{'/'.join(rest)}"
 
 
 class AccessToken(TypedDict):
@@ -8,45 +15,118 @@ class AccessToken(TypedDict):
     isAnonymous: bool
 
 
-class Owner(TypedDict):
+class Owner(NamedTuple):
     username: str
     display_name: str
-    url: str
+    url: Optional[str]
 
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> Self:
+        return cls(
+            username=data["username"],
+            display_name=data["name"],
+            url=parse_url(data["uri"]),
+        )
 
-class Topic(TypedDict):
+
+class Topic(NamedTuple):
     title: str
-    url: str
+    url: Optional[str]
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> Self:
+        return cls(
+            title=data["title"],
+            url=parse_url(data["uri"]),
+        )
 
 
-class Artist(TypedDict):
+class Artist(NamedTuple):
     name: str
-    url: str
+    url: Optional[str]
     is_verified: Optional[bool]
 
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> Self:
+        profile = data["profile"]
 
-class Album(TypedDict):
+        return cls(
+            name=profile["name"],
+            url=parse_url(data["uri"]),
+            is_verified=profile.get("verified"),
+        )
+
+
+class Album(NamedTuple):
     name: str
-    url: str
-    artist: list[Artist]
+    url: Optional[str]
+    artists: list[Artist]
 
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> Self:
+        artists = data.get("artists")
 
-class Song(TypedDict):
+        return cls(
+            name=data.get("name") or "N/A",
+            url=parse_url(data["uri"]),
+            artists=[Artist.from_data(artist) for artist in artists["items"]]
+            if artists
+            else [],
+        )
+
+
+class Song(NamedTuple):
     track_name: str
-    track_url: str
-    album: Album
+    track_url: Optional[str]
+    album: Optional[Album]
     artists: list[Artist]
 
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> Self:
+        album = data.get("albumOfTrack")
+
+        return cls(
+            track_name=data["name"],
+            track_url=parse_url(data["uri"]),
+            album=Album.from_data(album) if album else None,
+            artists=[Artist.from_data(artist) for artist in data["artists"]["items"]],
+        )
+
 
-class Playlist(TypedDict):
+class Playlist(NamedTuple):
     name: str
-    url: str
+    url: Optional[str]
     description: str
     owner: Optional[Owner]
 
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> Self:
+        owner = (data.get("ownerV2") or {}).get("data")
 
-class Podcast(TypedDict):
+        return cls(
+            name=data["name"],
+            url=parse_url(data["uri"]),
+            description=data.get("description") or "",
+            owner=Owner.from_data(owner) if owner else None,
+        )
+
+
+class Podcast(NamedTuple):
     name: str
-    url: str
+    url: Optional[str]
     topics: list[Topic]
     publisher: str
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> Self:
+        topics = data.get("topics")
+        publisher = data.get("publisher")
+
+        return cls(
+            name=data["name"],
+            url=parse_url(data["uri"]),
+            topics=[Topic.from_data(topic) for topic in topics["items"] if topic]
+            if topics
+            else [],
+            publisher=publisher.get("name", "UNKNOWN") if publisher else "UNKNOWN",
+        )
@@ -30,6 +30,16 @@ CREATE TABLE IF NOT EXISTS anime_reminders (
     PRIMARY KEY (user_id, anilist_id)
 );
 
+-- a single post in a guild channel, instead of a DM for every member.
+CREATE TABLE IF NOT EXISTS anime_channel_reminders (
+    guild_id BIGINT NOT NULL,
+    channel_id BIGINT NOT NULL,
+    anilist_id INT NOT NULL,
+    -- pinged alongside the post, if set.
+    role_id BIGINT,
+    PRIMARY KEY (channel_id, anilist_id)
+);
+
 CREATE OR REPLACE FUNCTION toggle_reminder(
     uid BIGINT, 
     aid INT
@@ -63,4 +73,59 @@ END IF;
 
 END;
 
-$$ LANGUAGE plpgsql;
\ No newline at end of file
+$$ LANGUAGE plpgsql;
+
+-- every airing that has had its reminders queued up, the primary key makes sure
+-- only one process (or one run) ever queues the reminders for an episode.
+CREATE TABLE IF NOT EXISTS anime_airings (
+    anilist_id INT NOT NULL,
+    episode INT NOT NULL,
+    airing_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    title TEXT NOT NULL,
+    native_title TEXT,
+    thumbnail TEXT,
+    PRIMARY KEY (anilist_id, episode)
+);
+
+CREATE TABLE IF NOT EXISTS anime_reminder_outbox (
+    anilist_id INT NOT NULL,
+    episode INT NOT NULL,
+    user_id BIGINT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- set when a process picks the row up, rows claimed for too long are retried.
+    claimed_at TIMESTAMP WITH TIME ZONE,
+    delivered_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (anilist_id, episode, user_id),
+    FOREIGN KEY (anilist_id, episode) REFERENCES anime_airings ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS anime_reminder_outbox_pending_idx
+    ON anime_reminder_outbox (created_at) WHERE delivered_at IS NULL;
+
+-- the channel side of the outbox, a post per subscribed channel and airing.
+CREATE TABLE IF NOT EXISTS anime_channel_outbox (
+    anilist_id INT NOT NULL,
+    episode INT NOT NULL,
+    channel_id BIGINT NOT NULL,
+    role_id BIGINT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    claimed_at TIMESTAMP WITH TIME ZONE,
+    delivered_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (anilist_id, episode, channel_id),
+    FOREIGN KEY (anilist_id, episode) REFERENCES anime_airings ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS anime_channel_outbox_pending_idx
+    ON anime_channel_outbox (created_at) WHERE delivered_at IS NULL;
+
+-- a shared cache for upstream API responses, it's `UNLOGGED` since everything in
+-- here can be re-fetched, so there's no point paying for the WAL.
+CREATE UNLOGGED TABLE IF NOT EXISTS upstream_cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BYTEA NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+
+CREATE INDEX IF NOT EXISTS upstream_cache_expires_at_idx ON upstream_cache (expires_at);
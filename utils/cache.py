@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import time
+import zlib
+import pickle
+import logging
+
+from datetime import datetime, timezone
+
+from cachetools import LRUCache
+from discord.ext import tasks
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Optional
+
+    from asyncpg import Pool
+
+logger = logging.getLogger("discord")
+
+# bump this whenever a cached type changes shape (i.e. a field is added to
+# `Media`), so rows pickled by an older version are never read back.
+SCHEMA_VERSION = 1
+
+
+class Cache:
+    """
+    A two level cache for upstream responses.
+
+    Lookups hit an in-memory LRU first, then fall back to the `upstream_cache`
+    table, which outlives restarts and is shared between every bot process.
+    Values are pickled and compressed before they're written to Postgres,
+    under a namespace tagged with `SCHEMA_VERSION`. A row that can't be
+    unpickled anyway is treated as a miss and deleted.
+    """
+
+    def __init__(self, pool: Pool, *, maxsize: int = 1024):
+        self.pool = pool
+        self._local: LRUCache[tuple[str, str], tuple[float, Any]] = LRUCache(
+            maxsize=maxsize
+        )
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _loads(value: bytes) -> Any:
+        return pickle.loads(zlib.decompress(value))
+
+    @staticmethod
+    def _namespace(namespace: str) -> str:
+        return f"{namespace}:v{SCHEMA_VERSION}"
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Gets a value from the cache, returns `None` if it's missing or expired.
+
+        Parameters
+        -----------
+        namespace: str
+            What the cached value belongs to, e.g. `anilist` or `spotify`.
+
+        key: str
+            The key of the value within the namespace.
+        """
+
+        local = self._local.get((namespace, key))
+        if local:
+            expires_at, value = local
+            if expires_at > time.time():
+                return value
+
+            self._local.pop((namespace, key), None)
+
+        row = await self.pool.fetchrow(
+            """
+            SELECT value, expires_at FROM upstream_cache
+                WHERE namespace = $1
+                  AND key = $2
+                  AND expires_at > NOW()
+            """,
+            self._namespace(namespace),
+            key,
+        )
+
+        if not row:
+            return None
+
+        try:
+            value = self._loads(row["value"])
+        except Exception:
+            logger.warning(f"Dropping unreadable cache entry {namespace}:{key}.")
+            await self.delete(namespace, key)
+            return None
+
+        self._local[(namespace, key)] = (row["expires_at"].timestamp(), value)
+
+        return value
+
+    async def set(self, namespace: str, key: str, value: Any, *, ttl: int) -> None:
+        """
+        Puts a value in both levels of the cache.
+
+        Parameters
+        -----------
+        namespace: str
+            What the cached value belongs to, e.g. `anilist` or `spotify`.
+
+        key: str
+            The key of the value within the namespace.
+
+        value: Any
+            The value to cache, this has to be picklable.
+
+        ttl: int
+            How long the value is valid for, in seconds.
+        """
+
+        expires_at = time.time() + ttl
+        self._local[(namespace, key)] = (expires_at, value)
+
+        await self.pool.execute(
+            """
+            INSERT INTO upstream_cache (namespace, key, value, expires_at)
+                VALUES ($1, $2, $3, $4)
+            ON CONFLICT (namespace, key) DO UPDATE
+                SET value = EXCLUDED.value,
+                    expires_at = EXCLUDED.expires_at
+            """,
+            self._namespace(namespace),
+            key,
+            self._dumps(value),
+            datetime.fromtimestamp(expires_at, tz=timezone.utc),
+        )
+
+    async def delete(self, namespace: str, key: str) -> None:
+        self._local.pop((namespace, key), None)
+
+        await self.pool.execute(
+            "DELETE FROM upstream_cache WHERE namespace = $1 AND key = $2",
+            self._namespace(namespace),
+            key,
+        )
+
+    @tasks.loop(minutes=15)
+    async def sweeper(self):
+        await self.pool.execute("DELETE FROM upstream_cache WHERE expires_at <= NOW()")
@@ -17,6 +17,7 @@ from typing import Any, Dict, Type, Union
 from utils import as_chunks, to_cb
 from libs.anilist import AniList
 
+from .cache import Cache
 from .constants import STARTUP_QUERY
 from .dynamic_delete import DeleteButton
 
@@ -73,6 +74,7 @@ async def get_prefix(bot: "Bot", message: discord.Message):
 class Bot(commands.Bot):
     queue: Queue[logging.LogRecord]
     anilist: AniList
+    cache: Cache
 
     def __init__(self, *args: Any, **kwargs: Any):
         kwargs.setdefault("command_prefix", get_prefix)
@@ -151,7 +153,6 @@ class Bot(commands.Bot):
     async def setup_hook(self):
         # called before the bot starts
         self.session = ClientSession()
-        self.anilist = AniList(self.session)
         self.start_time = discord.utils.utcnow()
         self.is_dev = self.config["Bot"]["IS_DEV"]
 
@@ -188,6 +189,11 @@ class Bot(commands.Bot):
 
         await self.pool.execute(STARTUP_QUERY)
 
+        self.cache = Cache(self.pool)
+        self.cache.sweeper.start()
+
+        self.anilist = AniList(self.session, cache=self.cache)
+
         self.prefixes: Dict[int, str] = {
             prefix["guild_id"]: prefix["prefix"]
             for prefix in (
@@ -228,6 +234,10 @@ class Bot(commands.Bot):
         super().run(*args, **kwargs)
 
     async def close(self):
+        # `setup_hook` might've failed before the cache was made.
+        if hasattr(self, "cache"):
+            self.cache.sweeper.cancel()
+
         await super().close()
         await self.pool.close()
         await self.session.close()